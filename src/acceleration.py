@@ -0,0 +1,33 @@
+# Compilation à la volée (JIT) optionnelle avec Numba
+# Numba n'est pas obligatoire : sans lui, le code Python est utilisé
+
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    NUMBA_DISPONIBLE = False
+    
+    # Sans Numba, une boucle prange est une boucle ordinaire
+    prange = range
+    
+    def get_num_threads():
+        """
+        Remplace numba.get_num_threads : sans Numba, un seul fil d'exécution.
+        """
+        return 1
+    
+    def njit(*args, **kwargs):
+        """
+        Remplace numba.njit quand Numba n'est pas installé.
+        
+        Le décorateur ne fait rien : la fonction reste une fonction Python.
+        Il accepte les mêmes formes d'appel que numba.njit
+        (@njit ou @njit(cache=True, ...)).
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorateur(fonction):
+            return fonction
+        
+        return decorateur
@@ -1,7 +1,24 @@
 # Fichier pour le calcul des distances
 # Centralise le calcul des distances entre les points
 
+import hashlib
 import math
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+from src.lecture_tsp import Points, creer_points
+
+
+# Dossier du cache disque des matrices de distances
+DOSSIER_CACHE_DISTANCES = os.path.join('.cache', 'distances')
+
+# Nombre de points à partir duquel la matrice est mise en cache sur le disque
+# (en dessous, la calculer est plus rapide que lire le fichier)
+TAILLE_MIN_CACHE_DISTANCES = 1000
 
 
 def distance_euclidienne(point1, point2):
@@ -17,7 +34,7 @@ def distance_euclidienne(point1, point2):
     Args:
         point1: Tuple (id, x, y) du premier point
         point2: Tuple (id, x, y) du deuxième point
-        
+    
     Returns:
         Distance euclidienne entre les deux points
     """
@@ -35,37 +52,151 @@ def distance_euclidienne(point1, point2):
     return distance
 
 
+@dataclass(eq=False)
+class MatriceDistances:
+    """
+    Matrice des distances stockée dans un tableau numpy contigu.
+    
+    Les distances sont rangées dans un tableau float64 de taille (n, n)
+    indexé par la position des points (0..n-1). Le dictionnaire indices
+    fait le lien entre l'identifiant TSPLIB d'un point et sa ligne.
+    
+    Les calculs vectorisés utilisent directement le tableau (matrice).
+    Les boucles Python intensives qui lisent beaucoup de distances une par
+    une utilisent plutôt lignes (la même matrice en listes Python), car
+    lire un élément d'un tableau numpy depuis Python est plus lent.
+    lignes n'est construite qu'à la première demande : elle contient n²
+    flottants Python, soit environ 1 Go pour une instance de 6000 points.
+    Les accès isolés (distances[(i, j)], obtenir_distance) lisent donc
+    directement le tableau, sans la construire.
+    
+    Pour rester compatible avec l'ancien dictionnaire, distances[(i, j)]
+    donne toujours la distance entre les points d'identifiants i et j.
+    
+    Attributs :
+        matrice: Tableau float64 (n, n) des distances
+        indices: Dictionnaire id_point -> indice de ligne dans la matrice
+    """
+    matrice: np.ndarray
+    indices: dict
+    
+    def __getitem__(self, paire):
+        id_point1, id_point2 = paire
+        return self.matrice.item(self.indices[id_point1], self.indices[id_point2])
+    
+    def __len__(self):
+        return len(self.indices)
+    
+    @cached_property
+    def lignes(self):
+        """
+        Matrice sous forme de listes Python, pour les boucles qui lisent
+        beaucoup de distances élément par élément (construite à la demande).
+        """
+        return self.matrice.tolist()
+    
+    @cached_property
+    def identifiants(self):
+        """
+        Tableau des identifiants rangés par ligne : identifiants[k] est l'id de la ligne k.
+        """
+        identifiants = np.empty(len(self.indices), dtype=np.int64)
+        for id_point, k in self.indices.items():
+            identifiants[k] = id_point
+        return identifiants
+    
+    def indices_de(self, identifiants):
+        """
+        Convertit une liste d'identifiants en tableau d'indices de lignes.
+        
+        Args:
+            identifiants: Liste d'identifiants de points
+        
+        Returns:
+            Tableau numpy des indices correspondants
+        """
+        return np.fromiter((self.indices[i] for i in identifiants), dtype=np.intp,
+                           count=len(identifiants))
+
+
 def creer_matrice_distances(points):
     """
     Crée une matrice des distances entre tous les points.
     
-    La matrice est stockée sous forme de dictionnaire pour faciliter
-    l'accès : distances[(i, j)] donne la distance entre le point i et j.
+    La matrice est un tableau numpy (n, n) calculé en une seule opération
+    vectorisée sur les coordonnées (voir Points.matrice_distances).
+    L'accès par identifiants reste possible : distances[(i, j)] donne la
+    distance entre le point i et le point j.
     
     Args:
-        points: Liste de tuples (id, x, y) représentant les points
-        
+        points: Objet Points ou liste de tuples (id, x, y) représentant les points
+    
+    Returns:
+        Objet MatriceDistances
+    """
+    # Conversion en tableaux si on reçoit une liste de tuples
+    if not isinstance(points, Points):
+        points = creer_points([point[0] for point in points],
+                              [(point[1], point[2]) for point in points])
+    
+    # Correspondance identifiant -> ligne de la matrice (mémorisée sur les points)
+    return MatriceDistances(_matrice_distances_points(points), points.indices)
+
+
+def _matrice_distances_points(points):
+    """
+    Retourne la matrice des distances des points, en passant par le cache disque.
+    
+    Pour les grandes instances, la matrice est enregistrée dans un fichier
+    .npz (dossier DOSSIER_CACHE_DISTANCES) dont le nom est une empreinte des
+    identifiants et des coordonnées : une exécution suivante sur la même
+    instance relit la matrice au lieu de la recalculer. Le cache n'est
+    qu'une optimisation : un fichier illisible est recalculé et une erreur
+    d'écriture est ignorée.
+    
+    Args:
+        points: Objet Points
+    
     Returns:
-        Dictionnaire où distances[(i, j)] = distance entre i et j
+        Tableau float64 (n, n) des distances (mémorisé dans points.matrice_distances)
     """
-    distances = {}
-    nombre_points = len(points)
-    
-    # Calcul de la distance entre chaque paire de points
-    for i in range(nombre_points):
-        for j in range(nombre_points):
-            point_i = points[i]
-            point_j = points[j]
-            
-            # La distance d'un point à lui-même est 0
-            if i == j:
-                distances[(point_i[0], point_j[0])] = 0.0
-            else:
-                # Calcul de la distance euclidienne
-                dist = distance_euclidienne(point_i, point_j)
-                distances[(point_i[0], point_j[0])] = dist
-    
-    return distances
+    # Matrice déjà calculée pour cet objet, ou instance trop petite pour le cache
+    if 'matrice_distances' in vars(points) or len(points) < TAILLE_MIN_CACHE_DISTANCES:
+        return points.matrice_distances
+    
+    empreinte = hashlib.blake2b(digest_size=16)
+    empreinte.update(np.ascontiguousarray(points.ids, dtype=np.int64).tobytes())
+    empreinte.update(np.ascontiguousarray(points.xy, dtype=np.float64).tobytes())
+    chemin_cache = os.path.join(DOSSIER_CACHE_DISTANCES, empreinte.hexdigest() + '.npz')
+    
+    try:
+        with np.load(chemin_cache) as donnees:
+            matrice = donnees['matrice']
+        if matrice.shape == (len(points), len(points)):
+            # Mémorisation sur l'objet, comme si la propriété avait été calculée
+            points.matrice_distances = matrice
+            return matrice
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    matrice = points.matrice_distances
+    
+    # Écriture dans un fichier temporaire puis renommage, pour qu'un autre
+    # processus ne lise jamais un fichier à moitié écrit
+    try:
+        os.makedirs(DOSSIER_CACHE_DISTANCES, exist_ok=True)
+        descripteur, chemin_temporaire = tempfile.mkstemp(dir=DOSSIER_CACHE_DISTANCES, suffix='.tmp')
+        try:
+            with os.fdopen(descripteur, 'wb') as fichier:
+                np.savez(fichier, matrice=matrice)
+            os.replace(chemin_temporaire, chemin_cache)
+        except BaseException:
+            os.remove(chemin_temporaire)
+            raise
+    except OSError:
+        pass
+    
+    return matrice
 
 
 def obtenir_distance(distances, id_point1, id_point2):
@@ -73,11 +204,14 @@ def obtenir_distance(distances, id_point1, id_point2):
     Récupère la distance entre deux points à partir de la matrice.
     
     Args:
-        distances: Dictionnaire des distances créé par creer_matrice_distances
+        distances: Matrice des distances créée par creer_matrice_distances
         id_point1: Identifiant du premier point
         id_point2: Identifiant du deuxième point
-        
+    
     Returns:
         Distance entre les deux points
     """
-    return distances[(id_point1, id_point2)]
+    indices = distances.indices
+    # Lecture dans le tableau numpy (item renvoie un float Python) : pas
+    # besoin de convertir toute la matrice en listes pour une seule distance
+    return distances.matrice.item(indices[id_point1], indices[id_point2])
@@ -51,7 +51,8 @@ def comparer_methodes(chemin_fichier, p, alpha=0.5, tester_plne=True):
     print("1. Heuristique initiale (grille)...")
     debut = time.time()
     solution_grille = construire_solution_initiale(
-        points, p, methode_selection='grille', ameliorer_cycle=True, alpha=alpha
+        points, p, methode_selection='grille', ameliorer_cycle=True, alpha=alpha,
+        distances=distances
     )
     temps_grille = time.time() - debut
     resultats['methodes']['heuristique_grille'] = {
@@ -68,7 +69,8 @@ def comparer_methodes(chemin_fichier, p, alpha=0.5, tester_plne=True):
     print("2. Heuristique initiale (aléatoire)...")
     debut = time.time()
     solution_aleatoire = construire_solution_initiale(
-        points, p, methode_selection='aleatoire', ameliorer_cycle=True, alpha=alpha
+        points, p, methode_selection='aleatoire', ameliorer_cycle=True, alpha=alpha,
+        distances=distances
     )
     temps_aleatoire = time.time() - debut
     resultats['methodes']['heuristique_aleatoire'] = {
@@ -106,7 +108,8 @@ def comparer_methodes(chemin_fichier, p, alpha=0.5, tester_plne=True):
     if tester_plne and n <= 15:
         print("4. PLNE (résolution exacte)...")
         debut = time.time()
-        solution_plne = resoudre_plne(points, p, alpha=alpha, timeout=300)
+        solution_plne = resoudre_plne(points, p, alpha=alpha, timeout=300,
+                                      distances=distances)
         temps_plne = time.time() - debut
         
         if solution_plne is not None:
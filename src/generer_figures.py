@@ -3,29 +3,67 @@
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 # Ajout du répertoire parent au path pour les imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.lecture_tsp import lire_fichier_tsp
+# Backend sans affichage, choisi avant tout import de pyplot :
+# les figures sont seulement enregistrées dans des fichiers
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+from src.lecture_tsp import lire_fichier_tsp_cache
+from src.calcul_distances import creer_matrice_distances
 from src.visualisation import sauvegarder_instance, sauvegarder_solution_complete
 from src.heuristiques.solution_initiale import construire_solution_initiale
 from src.liste_instances import lister_instances_par_taille
 
 
-def generer_figures_instance(chemin_fichier, dossier_sortie='resultats/figures'):
+@lru_cache(maxsize=None)
+def _distances_instance(points):
+    """
+    Matrice des distances d'une instance, calculée une seule fois par objet Points.
+    """
+    return creer_matrice_distances(points)
+
+
+def _get_distances(chemin_fichier):
+    """
+    Lit une instance et calcule sa matrice des distances une seule fois.
+    
+    La lecture est mémorisée par (chemin, date de modification) dans
+    lire_fichier_tsp_cache, qui renvoie le même objet Points tant que le
+    fichier n'a pas changé ; la matrice est mémorisée pour cet objet.
+    Les figures d'une même instance générées avec plusieurs paramètres
+    (p, alpha) réutilisent donc les mêmes points et la même matrice.
+    
+    Args:
+        chemin_fichier: Chemin vers le fichier .tsp
+    
+    Returns:
+        Tuple (points, distances)
+    """
+    points = lire_fichier_tsp_cache(chemin_fichier)
+    return points, _distances_instance(points)
+
+
+def generer_figures_instance(chemin_fichier, dossier_sortie='resultats/figures', figure=None):
     """
     Génère la figure d'une instance TSPLIB.
     
     Args:
         chemin_fichier: Chemin vers le fichier .tsp
         dossier_sortie: Dossier où sauvegarder la figure
+        figure: Figure matplotlib à réutiliser (None = nouvelle figure)
     """
     # Création du dossier si nécessaire
     os.makedirs(dossier_sortie, exist_ok=True)
     
-    # Lecture de l'instance
-    points = lire_fichier_tsp(chemin_fichier)
+    # Lecture de l'instance (mémorisée, voir lire_fichier_tsp_cache)
+    points = lire_fichier_tsp_cache(chemin_fichier)
     
     # Nom du fichier sans extension
     nom_instance = os.path.basename(chemin_fichier).replace('.tsp', '')
@@ -34,12 +72,12 @@ def generer_figures_instance(chemin_fichier, dossier_sortie='resultats/figures')
     chemin_figure = os.path.join(dossier_sortie, f'instance_{nom_instance}.png')
     
     # Génération de la figure
-    sauvegarder_instance(points, chemin_figure, f"Instance {nom_instance}")
+    sauvegarder_instance(points, chemin_figure, f"Instance {nom_instance}", figure=figure)
     
     print(f"Figure générée : {chemin_figure}")
 
 
-def generer_figures_solution(chemin_fichier, p, alpha=0.5, dossier_sortie='resultats/figures'):
+def generer_figures_solution(chemin_fichier, p, alpha=0.5, dossier_sortie='resultats/figures', figure=None):
     """
     Génère les figures d'une solution pour une instance.
     
@@ -48,19 +86,21 @@ def generer_figures_solution(chemin_fichier, p, alpha=0.5, dossier_sortie='resul
         p: Nombre de stations
         alpha: Coefficient de pondération
         dossier_sortie: Dossier où sauvegarder les figures
+        figure: Figure matplotlib à réutiliser (None = nouvelle figure)
     """
     # Création du dossier si nécessaire
     os.makedirs(dossier_sortie, exist_ok=True)
     
-    # Lecture de l'instance
-    points = lire_fichier_tsp(chemin_fichier)
+    # Lecture de l'instance (points et distances mémorisés par instance)
+    points, distances = _get_distances(chemin_fichier)
     
     # Nom du fichier sans extension
     nom_instance = os.path.basename(chemin_fichier).replace('.tsp', '')
     
     # Construction de la solution
     solution = construire_solution_initiale(points, p, methode_selection='grille', 
-                                          ameliorer_cycle=True, alpha=alpha)
+                                          ameliorer_cycle=True, alpha=alpha,
+                                          distances=distances)
     
     # Chemin de sortie
     chemin_figure = os.path.join(dossier_sortie, 
@@ -68,65 +108,116 @@ def generer_figures_solution(chemin_fichier, p, alpha=0.5, dossier_sortie='resul
     
     # Génération de la figure
     sauvegarder_solution_complete(points, solution, chemin_figure, 
-                                 f"Solution {nom_instance} (p={p}, α={alpha})")
+                                 f"Solution {nom_instance} (p={p}, α={alpha})",
+                                 figure=figure)
     
     print(f"Figure générée : {chemin_figure}")
 
 
-def generer_toutes_figures():
+# Figure réutilisée pour toutes les images d'un processus du pool
+_figure_processus = None
+
+
+def _initialiser_processus():
+    """
+    Initialise un processus du pool : crée la figure qu'il réutilisera.
+    
+    La figure est créée directement (sans pyplot) : elle n'est rattachée
+    à aucune fenêtre et est simplement vidée entre deux images.
+    """
+    global _figure_processus
+    _figure_processus = Figure()
+
+
+def _generer_figures_tache(tache):
+    """
+    Génère les figures d'une tâche (exécuté dans un processus du pool).
+    
+    Une tâche est soit ('instance', chemin), soit ('solution', chemin, parametres)
+    où parametres est une liste de couples (p, alpha). Les figures de solution
+    d'une même instance sont regroupées dans une seule tâche pour que la
+    lecture et la matrice des distances soient réutilisées (_get_distances).
+    
+    Args:
+        tache: Tuple décrivant les figures à générer
+    """
+    type_tache, instance = tache[0], tache[1]
+    
+    try:
+        if type_tache == 'instance':
+            # Vérification que l'instance a des coordonnées avant de générer la figure
+            points = lire_fichier_tsp_cache(instance)
+            if len(points) > 0:
+                generer_figures_instance(instance, figure=_figure_processus)
+            else:
+                nom_instance = os.path.basename(instance)
+                print(f"Instance {nom_instance} ignorée (pas de coordonnées, utilise une matrice de distances)")
+        else:
+            for p, alpha in tache[2]:
+                generer_figures_solution(instance, p=p, alpha=alpha,
+                                         figure=_figure_processus)
+    except Exception as e:
+        print(f"Erreur pour {instance} : {e}")
+
+
+def generer_toutes_figures(nombre_processus=None, dossier='donnees/tsplib'):
     """
     Génère toutes les figures pour les instances disponibles.
     Utilise toutes les instances TSPLIB disponibles dans donnees/tsplib/.
+    
+    Les instances sont indépendantes : les figures sont réparties sur
+    plusieurs processus (un par cœur par défaut).
+    
+    Args:
+        nombre_processus: Nombre de processus à utiliser (None = nombre de cœurs)
+        dossier: Chemin vers le dossier contenant les instances
     """
     # Récupération de toutes les instances disponibles
     # On se limite aux petites et moyennes instances pour les figures
     # (les grandes instances peuvent être trop lourdes à visualiser)
-    instances_petites = lister_instances_par_taille(taille_max=100)
+    instances_petites = lister_instances_par_taille(dossier, taille_max=100)
     
     print(f"Génération des figures pour {len(instances_petites)} instances...")
     print("(Instances avec n <= 100 points)\n")
     
-    print("Génération des figures d'instances...")
-    for instance in instances_petites:
-        if os.path.exists(instance):
-            try:
-                # Vérification que l'instance a des coordonnées avant de générer la figure
-                from src.lecture_tsp import lire_fichier_tsp
-                points = lire_fichier_tsp(instance)
-                if len(points) > 0:
-                    generer_figures_instance(instance)
-                else:
-                    nom_instance = os.path.basename(instance)
-                    print(f"Instance {nom_instance} ignorée (pas de coordonnées, utilise une matrice de distances)")
-            except Exception as e:
-                print(f"Erreur pour {instance} : {e}")
-        else:
-            print(f"Instance non trouvée : {instance}")
+    # Les instances listées existent : pas de vérification fichier par fichier
+    taches = [('instance', instance) for instance in instances_petites]
+    
+    # Fichiers présents, obtenus en un seul parcours du dossier
+    fichiers_disponibles = {
+        entree.name: entree.path for entree in os.scandir(dossier)
+        if entree.name.endswith('.tsp')
+    }
     
-    print("\nGénération des figures de solutions...")
     # Pour les solutions, on génère pour plusieurs instances représentatives
     # avec différentes tailles et différents paramètres
     instances_representatives = [
-        'donnees/tsplib/burma14.tsp',      # Petite instance pour PLNE
-        'donnees/tsplib/ulysses16.tsp',    # Petite instance
-        'donnees/tsplib/att48.tsp',        # Instance moyenne (utilisée dans le rapport)
-        'donnees/tsplib/berlin52.tsp',    # Instance moyenne (utilisée dans le rapport)
-        'donnees/tsplib/eil51.tsp',        # Instance moyenne
-        'donnees/tsplib/st70.tsp',         # Instance moyenne-grande
-        'donnees/tsplib/a280.tsp'          # Grande instance (limite)
+        'burma14.tsp',      # Petite instance pour PLNE
+        'ulysses16.tsp',    # Petite instance
+        'att48.tsp',        # Instance moyenne (utilisée dans le rapport)
+        'berlin52.tsp',     # Instance moyenne (utilisée dans le rapport)
+        'eil51.tsp',        # Instance moyenne
+        'st70.tsp',         # Instance moyenne-grande
+        'a280.tsp'          # Grande instance (limite)
     ]
     
-    for instance in instances_representatives:
-        if os.path.exists(instance):
-            try:
-                # Génération avec différents paramètres pour comparaison
-                generer_figures_solution(instance, p=5, alpha=0.5)
-                # Pour les petites instances, on génère aussi avec p=3
-                nom_instance = os.path.basename(instance).replace('.tsp', '')
-                if 'burma14' in nom_instance or 'ulysses16' in nom_instance:
-                    generer_figures_solution(instance, p=3, alpha=0.5)
-            except Exception as e:
-                print(f"Erreur pour {instance} : {e}")
+    for nom_fichier in instances_representatives:
+        instance = fichiers_disponibles.get(nom_fichier)
+        if instance is not None:
+            # Génération avec différents paramètres pour comparaison
+            parametres = [(5, 0.5)]
+            # Pour les petites instances, on génère aussi avec p=3
+            if nom_fichier in ('burma14.tsp', 'ulysses16.tsp'):
+                parametres.append((3, 0.5))
+            taches.append(('solution', instance, parametres))
+    
+    print("Génération des figures d'instances et de solutions...")
+    if nombre_processus is None:
+        nombre_processus = os.cpu_count()
+    
+    with ProcessPoolExecutor(max_workers=nombre_processus,
+                             initializer=_initialiser_processus) as executeur:
+        list(executeur.map(_generer_figures_tache, taches))
     
     print("\nGénération terminée.")
 
@@ -3,95 +3,92 @@
 
 import random
 import math
-from src.calcul_distances import creer_matrice_distances
-from src.p_median.affectation import affecter_points_aux_stations, calculer_cout_affectation
-from src.tsp.plus_proche_voisin import construire_cycle_plus_proche_voisin, calculer_longueur_cycle
-from src.tsp.two_opt import ameliorer_cycle_2opt
+import numpy as np
+from src.p_median.affectation import evaluer_echange_station
+from src.tsp.plus_proche_voisin import calculer_longueur_cycle
+from src.tsp.two_opt import ameliorer_cycle_2opt_local
+from src.tsp.insertion import remplacer_station_cycle
+from src.heuristiques.solution_initiale import Solution
 
 
-def recalculer_solution(points, stations, distances, alpha=0.5):
+def evaluer_voisin(solution, stations, station_retiree, station_ajoutee,
+                   distances_affectation, distances):
     """
-    Recalcule une solution complète à partir d'une liste de stations.
+    Évalue un voisin obtenu par échange d'une station, par différence.
     
-    Utile pour la métaheuristique qui modifie les stations.
+    Au lieu de reconstruire le cycle et de réaffecter tous les points :
+    - le cycle courant est modifié localement (retrait de la station,
+      insertion au moindre coût de la nouvelle), puis amélioré par un 2-opt
+      qui n'examine que les stations voisines de la modification
+    - seuls les points touchés par l'échange sont réaffectés
     
     Args:
-        points: Liste de tuples (id, x, y) représentant tous les points
-        stations: Liste des identifiants des stations sélectionnées
-        distances: Dictionnaire des distances
-        alpha: Coefficient de pondération
-        
+        solution: Solution courante (objet Solution, non modifié)
+        stations: Liste des stations du voisin
+        station_retiree: Station retirée par l'échange
+        station_ajoutee: Station ajoutée par l'échange
+        distances_affectation: Dictionnaire id_point -> distance à sa station actuelle
+        distances: Matrice des distances
+    
     Returns:
-        Dictionnaire de solution complète
+        Tuple (cycle, longueur_cycle, delta_affectation, modifications)
     """
-    # Construction du cycle
-    cycle = construire_cycle_plus_proche_voisin(stations, distances)
-    cycle = ameliorer_cycle_2opt(cycle, distances)
+    # Cycle : modification locale
+    cycle = remplacer_station_cycle(solution.cycle, station_retiree, station_ajoutee, distances)
     
-    # Affectation des points
-    affectations = affecter_points_aux_stations(points, stations, distances)
+    # Stations à examiner : les trois nouvelles arêtes du cycle sont les deux
+    # arêtes de la station ajoutée et l'arête qui relie les deux anciennes
+    # voisines de la station retirée (couverte en examinant l'une d'elles)
+    # (recherche à partir de 1 : la station précédente existe toujours)
+    position_retrait = solution.cycle.index(station_retiree, 1)
+    stations_touchees = (station_ajoutee, solution.cycle[position_retrait - 1])
     
-    # Calcul des coûts
+    # 2-opt limité aux stations touchées (le cycle courant est déjà 2-optimal)
+    cycle = ameliorer_cycle_2opt_local(cycle, distances, stations_touchees)
     longueur_cycle = calculer_longueur_cycle(cycle, distances)
-    cout_affectation = calculer_cout_affectation(points, stations, distances)
-    cout_total = alpha * longueur_cycle + (1 - alpha) * cout_affectation
-    
-    solution = {
-        'stations': stations.copy(),
-        'cycle': cycle,
-        'affectations': affectations,
-        'longueur_cycle': longueur_cycle,
-        'cout_affectation': cout_affectation,
-        'cout_total': cout_total
-    }
     
-    return solution
+    # Affectations : variation du coût et points qui changent de station
+    delta_affectation, modifications = evaluer_echange_station(
+        stations, solution.affectations, distances_affectation,
+        station_retiree, station_ajoutee, distances
+    )
+    
+    return cycle, longueur_cycle, delta_affectation, modifications
 
 
-def generer_voisin_echange_station(points, stations_actuelles):
+def generer_voisin_echange_station(indices_retirables, points_non_stations):
     """
     Génère un voisin en échangeant une station avec un point non station.
     
     Voisinage simple : on retire une station (sauf la station 1) et on
     la remplace par un point non station choisi aléatoirement.
     
+    La liste des points non stations est maintenue par le recuit simulé
+    d'une itération à l'autre : il n'est pas nécessaire de la reconstruire
+    à partir de tous les points pour chaque voisin. Le tirage est en O(1).
+    
     Args:
-        points: Liste de tuples (id, x, y) représentant tous les points
-        stations_actuelles: Liste des identifiants des stations actuelles
-        
+        indices_retirables: Positions, dans la liste des stations, des stations
+                            qui peuvent être retirées (toutes sauf la station 1)
+        points_non_stations: Liste des identifiants des points non stations
+    
     Returns:
-        Nouvelle liste de stations (voisin)
+        Tuple (position_station_retiree, indice_point_ajoute) où
+        position_station_retiree est une position dans la liste des stations
+        et indice_point_ajoute une position dans points_non_stations,
+        ou None si aucun échange n'est possible
     """
-    # Création d'une copie
-    nouvelles_stations = stations_actuelles.copy()
-    
-    # Extraction de tous les identifiants
-    tous_ids = [point[0] for point in points]
-    stations_set = set(stations_actuelles)
-    
-    # Liste des points non stations
-    points_non_stations = [id_point for id_point in tous_ids if id_point not in stations_set]
-    
-    # Si on n'a pas de points non stations, on ne peut pas échanger
-    if len(points_non_stations) == 0:
-        return nouvelles_stations
+    # Pas de point non station ou seule la station 1 : aucun échange possible
+    if len(points_non_stations) == 0 or len(indices_retirables) == 0:
+        return None
     
     # Sélection aléatoire d'une station à retirer (sauf la station 1)
-    stations_retirables = [s for s in nouvelles_stations if s != 1]
-    if len(stations_retirables) == 0:
-        # Si seule la station 1 reste, on ne peut pas échanger
-        return nouvelles_stations
-    
-    station_a_retirer = random.choice(stations_retirables)
+    position_retrait = random.choice(indices_retirables)
     
     # Sélection aléatoire d'un point non station à ajouter
-    point_a_ajouter = random.choice(points_non_stations)
-    
-    # Échange
-    nouvelles_stations.remove(station_a_retirer)
-    nouvelles_stations.append(point_a_ajouter)
+    indice_ajout = random.randrange(len(points_non_stations))
     
-    return nouvelles_stations
+    return position_retrait, indice_ajout
 
 
 def recuit_simule(points, solution_initiale, distances, alpha=0.5, 
@@ -119,7 +116,11 @@ def recuit_simule(points, solution_initiale, distances, alpha=0.5,
     
     Voisinages utilisés :
     - Échange station / non station : modifie la sélection des stations
-    - 2-opt : améliore le cycle (appliqué à chaque recalcul)
+    - 2-opt : améliore le cycle (appliqué à chaque voisin)
+    
+    Évaluation par différence :
+    - Le cycle du voisin est obtenu en modifiant localement le cycle courant
+    - Seuls les points touchés par l'échange sont réaffectés
     
     Limites :
     - Temps de calcul : dépend du nombre d'itérations
@@ -137,48 +138,85 @@ def recuit_simule(points, solution_initiale, distances, alpha=0.5,
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         solution_initiale: Dictionnaire de solution initiale
-        distances: Dictionnaire des distances
+        distances: Matrice des distances
         alpha: Coefficient de pondération
         temperature_initiale: Température de départ
         temperature_finale: Température d'arrêt
         facteur_refroidissement: Facteur de réduction (0 < facteur < 1)
         iterations_par_temperature: Nombre d'itérations par température
-        
+    
     Returns:
-        Meilleure solution trouvée
+        Meilleure solution trouvée (dictionnaire, même format que la solution initiale)
     """
-    # Solution courante et meilleure solution
-    solution_courante = solution_initiale.copy()
-    solution_courante['stations'] = solution_initiale['stations'].copy()
-    meilleure_solution = solution_courante.copy()
-    meilleure_solution['stations'] = solution_initiale['stations'].copy()
+    # Solution courante et meilleure solution, manipulées sous forme d'objets
+    # Solution (accès par attribut) ; le dictionnaire initial n'est pas modifié
+    solution_courante = Solution.depuis_dict(solution_initiale)
+    solution_courante.stations = solution_initiale['stations'].copy()
+    meilleure_solution = solution_courante
     
     meilleur_cout = solution_initiale['cout_total']
     temperature = temperature_initiale
     
+    # Poids du cycle et de l'affectation, constants pendant tout le recuit
+    poids_cycle = alpha
+    poids_affectation = 1 - alpha
+    
     # Compteurs pour le suivi
     nombre_acceptations = 0
     nombre_rejets = 0
     iteration = 0
     
+    # État du voisinage, construit une seule fois puis mis à jour à chaque acceptation :
+    # - positions des stations retirables (l'échange conserve la position)
+    # - liste des points non stations
+    indices_retirables = [k for k, s in enumerate(solution_courante.stations) if s != 1]
+    stations_set = set(solution_courante.stations)
+    points_non_stations = [point[0] for point in points if point[0] not in stations_set]
+    
+    # Distance de chaque point à sa station, mise à jour à chaque acceptation
+    distances_affectation = {
+        id_point: distances[(id_point, id_station)]
+        for id_point, id_station in solution_courante.affectations.items()
+    }
+    
+    # Générateur numpy pour les tests d'acceptation, initialisé à partir du
+    # module random : random.seed(...) rend toujours une exécution reproductible
+    generateur = np.random.default_rng(random.getrandbits(64))
+    
     # Boucle principale du recuit simulé
     while temperature > temperature_finale:
+        # Nombres aléatoires du palier, tirés en une seule fois
+        tirages = generateur.random(iterations_par_temperature).tolist()
+        
         # Itérations à température constante
-        for _ in range(iterations_par_temperature):
+        for k in range(iterations_par_temperature):
             iteration += 1
             
             # Génération d'un voisin (échange station / non station)
-            nouvelles_stations = generer_voisin_echange_station(points, solution_courante['stations'])
+            echange = generer_voisin_echange_station(indices_retirables, points_non_stations)
             
-            # Si le voisin est identique, on passe
-            if nouvelles_stations == solution_courante['stations']:
-                continue
+            # Aucun échange possible : la taille des listes ne change jamais,
+            # la solution initiale est donc la seule solution atteignable
+            if echange is None:
+                return meilleure_solution.to_dict()
             
-            # Recalcul de la solution avec les nouvelles stations
-            nouvelle_solution = recalculer_solution(points, nouvelles_stations, distances, alpha)
+            position_retrait, indice_ajout = echange
+            station_retiree = solution_courante.stations[position_retrait]
+            station_ajoutee = points_non_stations[indice_ajout]
+            nouvelles_stations = solution_courante.stations.copy()
+            nouvelles_stations[position_retrait] = station_ajoutee
             
-            # Calcul de la différence de coût
-            delta = nouvelle_solution['cout_total'] - solution_courante['cout_total']
+            # Évaluation du voisin par différence (sans tout recalculer)
+            cycle, longueur_cycle, delta_affectation, modifications = evaluer_voisin(
+                solution_courante, nouvelles_stations, station_retiree, station_ajoutee,
+                distances_affectation, distances
+            )
+            
+            # Différence de coût, combinée directement à partir des variations
+            # du cycle et de l'affectation (le coût total n'est calculé que si
+            # le voisin est accepté)
+            delta = (poids_cycle * (longueur_cycle - solution_courante.longueur_cycle) +
+                     poids_affectation * delta_affectation)
             
             # Décision d'acceptation
             accepter = False
@@ -189,8 +227,10 @@ def recuit_simule(points, solution_initiale, distances, alpha=0.5,
                 nombre_acceptations += 1
             else:
                 # Solution pire : on accepte avec probabilité exp(-delta/T)
-                probabilite = math.exp(-delta / temperature)
-                if random.random() < probabilite:
+                # Au-delà de 745, exp(-delta/T) vaut 0 en double précision :
+                # on rejette sans calculer l'exponentielle
+                rapport = delta / temperature
+                if rapport < 745.0 and tirages[k] < math.exp(-rapport):
                     accepter = True
                     nombre_acceptations += 1
                 else:
@@ -198,16 +238,33 @@ def recuit_simule(points, solution_initiale, distances, alpha=0.5,
             
             # Mise à jour de la solution courante
             if accepter:
-                solution_courante = nouvelle_solution.copy()
-                solution_courante['stations'] = nouvelle_solution['stations'].copy()
+                # La station retirée prend la place du point ajouté parmi les non stations
+                points_non_stations[indice_ajout] = station_retiree
+                
+                # Coûts du voisin accepté
+                cout_affectation = solution_courante.cout_affectation + delta_affectation
+                cout_total = poids_cycle * longueur_cycle + poids_affectation * cout_affectation
+                
+                # Application des changements d'affectation
+                affectations = solution_courante.affectations.copy()
+                for id_point, (id_station, distance) in modifications.items():
+                    affectations[id_point] = id_station
+                    distances_affectation[id_point] = distance
+                
+                nouvelle_solution = Solution(nouvelles_stations, cycle, affectations,
+                                             longueur_cycle, cout_affectation, cout_total)
+                
+                # nouvelle_solution vient d'être créée et n'est jamais modifiée
+                # ensuite (ses listes et dictionnaires non plus) : pas de copie
+                solution_courante = nouvelle_solution
                 
                 # Mise à jour de la meilleure solution
-                if nouvelle_solution['cout_total'] < meilleur_cout:
-                    meilleure_solution = nouvelle_solution.copy()
-                    meilleure_solution['stations'] = nouvelle_solution['stations'].copy()
-                    meilleur_cout = nouvelle_solution['cout_total']
+                if cout_total < meilleur_cout:
+                    meilleure_solution = nouvelle_solution
+                    meilleur_cout = cout_total
         
         # Refroidissement
         temperature *= facteur_refroidissement
     
-    return meilleure_solution
+    # Les appelants attendent un dictionnaire de solution
+    return meilleure_solution.to_dict()
@@ -1,15 +1,86 @@
 # Construction d'une solution initiale pour le problème anneau-étoile
 # Chaîne les méthodes p-médian et TSP pour produire une solution complète
 
+from dataclasses import dataclass
+
 from src.calcul_distances import creer_matrice_distances
 from src.p_median.heuristique_aleatoire import selectionner_stations_aleatoire
-from src.p_median.heuristique_gloutonne import selectionner_stations_grille
-from src.p_median.affectation import affecter_points_aux_stations, calculer_cout_affectation
+from src.p_median.heuristique_gloutonne import selectionner_stations_grille, selectionner_stations_eloignees
+from src.p_median.affectation import obtenir_affectations_et_cout
 from src.tsp.plus_proche_voisin import construire_cycle_plus_proche_voisin, calculer_longueur_cycle
 from src.tsp.two_opt import ameliorer_cycle_2opt
 
 
-def construire_solution_initiale(points, p, methode_selection='grille', ameliorer_cycle=True, alpha=0.5):
+@dataclass
+class Solution:
+    """
+    Solution du problème anneau-étoile, avec les mêmes champs que le
+    dictionnaire renvoyé par construire_solution_initiale.
+    
+    Utilisée dans les boucles chaudes (recuit simulé) : l'accès à un
+    attribut d'un objet à __slots__ est plus rapide qu'une recherche de
+    clé dans un dictionnaire, et l'objet est plus léger en mémoire.
+    Les __slots__ sont déclarés à la main (et non avec slots=True) pour
+    rester compatible avec Python 3.8.
+    
+    Attributs :
+        stations: Liste des identifiants des stations sélectionnées
+        cycle: Liste ordonnée des stations dans le cycle
+        affectations: Dictionnaire affectations[id_point] = id_station
+        longueur_cycle: Longueur totale du cycle
+        cout_affectation: Coût total d'affectation
+        cout_total: Coût total pondéré de la solution
+    """
+    __slots__ = ('stations', 'cycle', 'affectations', 'longueur_cycle',
+                 'cout_affectation', 'cout_total')
+    
+    stations: list
+    cycle: list
+    affectations: dict
+    longueur_cycle: float
+    cout_affectation: float
+    cout_total: float
+    
+    @classmethod
+    def depuis_dict(cls, solution):
+        """
+        Crée un objet Solution à partir d'un dictionnaire de solution.
+        
+        Args:
+            solution: Dictionnaire de solution créé par construire_solution_initiale
+        
+        Returns:
+            Objet Solution (les listes et dictionnaires ne sont pas copiés)
+        """
+        return cls(
+            solution['stations'],
+            solution['cycle'],
+            solution['affectations'],
+            solution['longueur_cycle'],
+            solution['cout_affectation'],
+            solution['cout_total']
+        )
+    
+    def to_dict(self):
+        """
+        Convertit la solution en dictionnaire, le format attendu par
+        afficher_solution, la visualisation et les comparaisons.
+        
+        Returns:
+            Dictionnaire de solution (mêmes clés que construire_solution_initiale)
+        """
+        return {
+            'stations': self.stations,
+            'cycle': self.cycle,
+            'affectations': self.affectations,
+            'longueur_cycle': self.longueur_cycle,
+            'cout_affectation': self.cout_affectation,
+            'cout_total': self.cout_total
+        }
+
+
+def construire_solution_initiale(points, p, methode_selection='grille', ameliorer_cycle=True, alpha=0.5,
+                                 distances=None):
     """
     Construit une solution complète pour le problème anneau-étoile.
     
@@ -42,11 +113,14 @@ def construire_solution_initiale(points, p, methode_selection='grille', ameliore
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         p: Nombre de stations à sélectionner
-        methode_selection: 'aleatoire' ou 'grille' pour la sélection des stations
+        methode_selection: 'aleatoire', 'grille' ou 'eloignees' (point le plus éloigné)
+                           pour la sélection des stations
         ameliorer_cycle: Si True, applique 2-opt pour améliorer le cycle
         alpha: Coefficient de pondération (0 <= alpha <= 1)
                coût_total = alpha * longueur_cycle + (1-alpha) * cout_affectation
-        
+        distances: Matrice des distances déjà calculée (optionnel).
+                   Si None, elle est créée avec creer_matrice_distances
+    
     Returns:
         Dictionnaire contenant :
         - 'stations': Liste des identifiants des stations sélectionnées
@@ -56,14 +130,17 @@ def construire_solution_initiale(points, p, methode_selection='grille', ameliore
         - 'cout_affectation': Coût total d'affectation
         - 'cout_total': Coût total pondéré de la solution
     """
-    # Création de la matrice des distances
-    distances = creer_matrice_distances(points)
+    # Création de la matrice des distances (si elle n'est pas fournie)
+    if distances is None:
+        distances = creer_matrice_distances(points)
     
     # Étape 1 : Sélection de p stations (p-médian)
     if methode_selection == 'aleatoire':
         stations = selectionner_stations_aleatoire(points, p)
     elif methode_selection == 'grille':
         stations = selectionner_stations_grille(points, p)
+    elif methode_selection == 'eloignees':
+        stations = selectionner_stations_eloignees(points, p)
     else:
         # Par défaut, on utilise la grille
         stations = selectionner_stations_grille(points, p)
@@ -76,11 +153,10 @@ def construire_solution_initiale(points, p, methode_selection='grille', ameliore
         cycle = ameliorer_cycle_2opt(cycle, distances)
     
     # Étape 4 : Affectation des points aux stations
-    affectations = affecter_points_aux_stations(points, stations, distances)
+    affectations, cout_affectation = obtenir_affectations_et_cout(points, stations, distances)
     
     # Étape 5 : Calcul des coûts
     longueur_cycle = calculer_longueur_cycle(cycle, distances)
-    cout_affectation = calculer_cout_affectation(points, stations, distances)
     
     # Coût total pondéré
     cout_total = alpha * longueur_cycle + (1 - alpha) * cout_affectation
@@ -1,6 +1,99 @@
 # Fichier pour le parsing des instances TSPLIB
 # Lit les fichiers au format TSPLIB et extrait les coordonnées des points
 
+import io
+import mmap
+import os
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+
+@dataclass(eq=False)
+class Points:
+    """
+    Points d'une instance stockés sous forme de tableaux numpy.
+    
+    Les identifiants et les coordonnées sont rangés dans deux tableaux
+    contigus (un tableau par champ) plutôt que dans une liste de tuples.
+    Les calculs vectorisés (matrice des distances, affichage) travaillent
+    directement sur ces tableaux.
+    
+    Pour rester compatible avec le reste du code, l'objet se comporte
+    comme une liste de tuples (id, x, y) : len(points), points[i] et
+    "for point in points" fonctionnent comme avant.
+    
+    Attributs :
+        ids: Tableau int32 de taille n contenant les identifiants
+        xy: Tableau float64 de taille (n, 2) contenant les coordonnées
+    """
+    ids: np.ndarray
+    xy: np.ndarray
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __iter__(self):
+        return iter(self.tuples)
+    
+    def __getitem__(self, indice):
+        return self.tuples[indice]
+    
+    @cached_property
+    def tuples(self):
+        """
+        Liste de tuples (id, x, y), construite seulement si on en a besoin.
+        """
+        return list(zip(self.ids.tolist(), self.xy[:, 0].tolist(), self.xy[:, 1].tolist()))
+    
+    @cached_property
+    def identifiants(self):
+        """
+        Liste Python des identifiants, construite une seule fois.
+        
+        La liste est partagée entre les appels : elle ne doit pas être modifiée.
+        """
+        return self.ids.tolist()
+    
+    @cached_property
+    def indices(self):
+        """
+        Dictionnaire id_point -> position du point, construit une seule fois.
+        
+        Le dictionnaire est partagé (entre autres avec la matrice des
+        distances créée à partir de ces points) : il ne doit pas être modifié.
+        """
+        return {id_point: k for k, id_point in enumerate(self.identifiants)}
+    
+    @cached_property
+    def matrice_distances(self):
+        """
+        Matrice (n, n) des distances euclidiennes entre tous les points.
+        
+        Calculée une seule fois par broadcasting numpy, puis mémorisée.
+        """
+        dx = self.xy[:, 0][:, np.newaxis] - self.xy[:, 0][np.newaxis, :]
+        dy = self.xy[:, 1][:, np.newaxis] - self.xy[:, 1][np.newaxis, :]
+        return np.sqrt(dx * dx + dy * dy)
+
+
+def creer_points(identifiants, coordonnees):
+    """
+    Crée un objet Points à partir des identifiants et des coordonnées.
+    
+    Args:
+        identifiants: Séquence des identifiants des points
+        coordonnees: Séquence de couples (x, y)
+    
+    Returns:
+        Objet Points
+    """
+    ids = np.asarray(identifiants, dtype=np.int32).reshape(-1)
+    xy = np.asarray(coordonnees, dtype=np.float64).reshape(-1, 2)
+    return Points(ids, xy)
+
+
 def lire_fichier_tsp(chemin_fichier):
     """
     Lit un fichier .tsp au format TSPLIB et extrait les points.
@@ -9,58 +102,116 @@ def lire_fichier_tsp(chemin_fichier):
     au lieu de coordonnées. Ces fichiers sont ignorés car on ne peut pas
     les visualiser sans coordonnées.
     
+    Le fichier est projeté en mémoire (mmap) et lu en octets : l'en-tête
+    est parcouru ligne par ligne (il est court), puis le bloc des
+    coordonnées est découpé et converti en nombres par numpy en une seule
+    fois, sans créer une chaîne Python par ligne pour les grandes instances.
+    
     Args:
         chemin_fichier: Chemin vers le fichier .tsp à lire
-        
+    
     Returns:
-        liste de tuples (id, x, y) représentant les points
-        Liste vide si le fichier n'a pas de coordonnées
+        Objet Points (utilisable comme une liste de tuples (id, x, y))
+        Objet vide si le fichier n'a pas de coordonnées
     """
-    points = []
-    edge_weight_type = None
+    dimension = None
     
-    # Ouverture du fichier en lecture
-    with open(chemin_fichier, 'r') as fichier:
-        # Indicateur pour savoir si on est dans la section des coordonnées
-        dans_section_coord = False
+    # Ouverture du fichier en lecture binaire
+    with open(chemin_fichier, 'rb') as fichier:
+        # Un fichier vide ne peut pas être projeté en mémoire
+        if os.fstat(fichier.fileno()).st_size == 0:
+            return creer_points([], [])
         
-        # Lecture ligne par ligne
-        for ligne in fichier:
-            # Suppression des espaces en début et fin de ligne
-            ligne = ligne.strip()
-            
-            # Détection du type de poids d'arête
-            if ligne.startswith('EDGE_WEIGHT_TYPE'):
-                edge_weight_type = ligne.split(':')[1].strip()
-                # Si c'est EXPLICIT, le fichier n'a pas de coordonnées
-                if edge_weight_type == 'EXPLICIT':
-                    return []
-            
-            # Détection du début de la section des coordonnées
-            if ligne == 'NODE_COORD_SECTION':
-                dans_section_coord = True
-                continue
-            
-            # Arrêt à la fin du fichier
-            if ligne == 'EOF':
-                break
-            
-            # Si on est dans la section des coordonnées, on lit les points
-            if dans_section_coord:
-                # Séparation de la ligne en éléments (id, x, y)
-                elements = ligne.split()
+        with mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as contenu:
+            # Lecture de l'en-tête jusqu'à la section des coordonnées
+            for ligne in iter(contenu.readline, b''):
+                # Suppression des espaces en début et fin de ligne
+                ligne = ligne.strip()
                 
-                # Vérification qu'on a bien 3 éléments
-                if len(elements) >= 3:
-                    try:
-                        id_point = int(elements[0])
-                        x = float(elements[1])
-                        y = float(elements[2])
-                        
-                        # Ajout du point à la liste
-                        points.append((id_point, x, y))
-                    except (ValueError, IndexError):
-                        # Ignore les lignes mal formatées
-                        continue
-    
-    return points
+                # Détection du type de poids d'arête
+                if ligne.startswith(b'EDGE_WEIGHT_TYPE'):
+                    edge_weight_type = ligne.split(b':')[1].strip()
+                    # Si c'est EXPLICIT, le fichier n'a pas de coordonnées
+                    if edge_weight_type == b'EXPLICIT':
+                        return creer_points([], [])
+                
+                # Nombre de points, pour savoir combien de lignes lire ensuite
+                elif ligne.startswith(b'DIMENSION'):
+                    dimension = int(ligne.split(b':')[1].strip())
+                
+                # Détection du début de la section des coordonnées
+                elif ligne == b'NODE_COORD_SECTION':
+                    break
+                
+                # Fin du fichier sans section de coordonnées
+                elif ligne == b'EOF':
+                    return creer_points([], [])
+            else:
+                return creer_points([], [])
+            
+            # Bloc des coordonnées, jusqu'au marqueur EOF s'il est présent
+            bloc = contenu[contenu.tell():]
+    
+    fin = bloc.find(b'EOF')
+    if fin != -1:
+        bloc = bloc[:fin]
+    
+    coordonnees = _convertir_bloc_coordonnees(bloc, dimension)
+    
+    # Séparation des identifiants et des coordonnées
+    return creer_points(coordonnees[:, 0], coordonnees[:, 1:3])
+
+
+def _convertir_bloc_coordonnees(bloc, dimension):
+    """
+    Convertit le bloc des coordonnées (lignes "id x y") en tableau (n, 3).
+    
+    Cas courant : chaque ligne a exactement trois valeurs, on découpe tout
+    le bloc d'un coup et numpy convertit les valeurs en un seul appel.
+    Sinon (colonnes supplémentaires), on revient à numpy.loadtxt.
+    
+    Args:
+        bloc: Octets du bloc des coordonnées
+        dimension: Nombre de points annoncé dans l'en-tête (ou None)
+    
+    Returns:
+        Tableau numpy (n, 3) contenant id, x et y
+    """
+    valeurs = bloc.split()
+    premiere_ligne = bloc.lstrip().split(b'\n', 1)[0]
+    
+    # Avec DIMENSION, on ne garde que les valeurs des points annoncés
+    if dimension is not None:
+        valeurs = valeurs[:3 * dimension]
+    
+    if len(valeurs) % 3 == 0 and len(premiere_ligne.split()) == 3:
+        return np.array(valeurs, dtype=np.float64).reshape(-1, 3)
+    
+    return np.loadtxt(io.BytesIO(bloc), max_rows=dimension, usecols=(0, 1, 2), ndmin=2)
+
+
+def lire_fichier_tsp_cache(chemin_fichier):
+    """
+    Lit un fichier .tsp en réutilisant le résultat des lectures précédentes.
+    
+    Le résultat de lire_fichier_tsp est mémorisé par (chemin, date de
+    modification) : relire le même fichier ne coûte qu'un appel à stat,
+    et un fichier modifié depuis la dernière lecture est relu.
+    
+    Le même objet Points est renvoyé à chaque appel : il ne doit pas être modifié.
+    
+    Args:
+        chemin_fichier: Chemin vers le fichier .tsp à lire
+    
+    Returns:
+        Objet Points (voir lire_fichier_tsp)
+    """
+    return _lire_fichier_tsp_memorise(chemin_fichier, os.path.getmtime(chemin_fichier))
+
+
+@lru_cache(maxsize=None)
+def _lire_fichier_tsp_memorise(chemin_fichier, date_modification):
+    """
+    Lecture mémorisée ; date_modification ne sert que de clé d'invalidation.
+    """
+    return lire_fichier_tsp(chemin_fichier)
@@ -2,6 +2,9 @@
 
 import os
 import glob
+import json
+import mmap
+from concurrent.futures import ThreadPoolExecutor
 
 
 def lister_instances_tsplib(dossier='donnees/tsplib'):
@@ -10,7 +13,7 @@ def lister_instances_tsplib(dossier='donnees/tsplib'):
     
     Args:
         dossier: Chemin vers le dossier contenant les instances
-        
+    
     Returns:
         Liste des chemins complets vers les fichiers .tsp
     """
@@ -27,13 +30,36 @@ def lister_instances_tsplib(dossier='donnees/tsplib'):
     return instances
 
 
-def obtenir_info_instance(chemin_fichier):
+# Nom du fichier de cache des informations d'instances (un par dossier)
+FICHIER_CACHE_INFO = '.instance_cache.json'
+
+# Caches déjà chargés, par dossier : {dossier: {nom_fichier: entrée}}
+_caches_info = {}
+
+# Dossiers dont le cache a été complété depuis le dernier enregistrement
+_caches_modifies = set()
+
+# Nombre maximal de fils d'exécution pour lire les en-têtes d'un dossier
+NOMBRE_FILS_LECTURE = 16
+
+
+def obtenir_info_instance(chemin_fichier, enregistrer_cache=True):
     """
     Obtient des informations sur une instance sans la charger complètement.
     
+    Les informations lues sont conservées dans un cache JSON placé dans le
+    dossier des instances (FICHIER_CACHE_INFO), avec la date de modification
+    et la taille du fichier. Tant que le fichier n'a pas changé, l'en-tête
+    n'est pas relu : un appel à os.stat suffit, y compris d'une exécution
+    du programme à l'autre.
+    
     Args:
         chemin_fichier: Chemin vers le fichier .tsp
-        
+        enregistrer_cache: Si True, le cache est réécrit sur le disque quand
+                           il a été complété ; mettre False pour enregistrer
+                           une seule fois après plusieurs appels
+                           (voir _enregistrer_cache_info)
+    
     Returns:
         Dictionnaire avec les informations de l'instance
     """
@@ -45,22 +71,160 @@ def obtenir_info_instance(chemin_fichier):
     }
     
     try:
-        with open(chemin_fichier, 'r') as f:
-            for ligne in f:
-                ligne = ligne.strip()
-                if ligne.startswith('DIMENSION'):
-                    info['dimension'] = int(ligne.split(':')[1].strip())
-                elif ligne.startswith('TYPE'):
-                    info['type'] = ligne.split(':')[1].strip()
-                elif ligne == 'NODE_COORD_SECTION':
-                    # On s'arrête ici pour ne pas lire tout le fichier
-                    break
+        etat = os.stat(chemin_fichier)
+    except OSError as e:
+        print(f"Erreur lors de la lecture de {chemin_fichier} : {e}")
+        return info
+    
+    # Recherche dans le cache : l'entrée n'est valable que si le fichier
+    # a la même date de modification et la même taille
+    dossier = os.path.normpath(os.path.dirname(chemin_fichier))
+    cache = _charger_cache_info(dossier)
+    entree = cache.get(info['nom'])
+    if entree is not None and entree['mtime_ns'] == etat.st_mtime_ns and entree['taille'] == etat.st_size:
+        info['dimension'] = entree['dimension']
+        info['type'] = entree['type']
+        return info
+    
+    try:
+        info['dimension'], info['type'] = _lire_entete_instance(chemin_fichier, etat.st_size)
     except Exception as e:
         print(f"Erreur lors de la lecture de {chemin_fichier} : {e}")
+        return info
+    
+    # Mise à jour du cache
+    cache[info['nom']] = {
+        'mtime_ns': etat.st_mtime_ns,
+        'taille': etat.st_size,
+        'dimension': info['dimension'],
+        'type': info['type']
+    }
+    _caches_modifies.add(dossier)
+    if enregistrer_cache:
+        _enregistrer_cache_info(dossier)
     
     return info
 
 
+def _lire_entete_instance(chemin_fichier, taille):
+    """
+    Lit la dimension et le type d'une instance dans l'en-tête du fichier.
+    
+    Le fichier est projeté en mémoire (mmap) : la fin de l'en-tête (première
+    section "..._SECTION", en général NODE_COORD_SECTION) est trouvée par une
+    seule recherche d'octets, puis seules les quelques lignes de l'en-tête
+    sont découpées. Le reste du fichier n'est jamais lu.
+    
+    Args:
+        chemin_fichier: Chemin vers le fichier .tsp
+        taille: Taille du fichier en octets (un fichier vide ne peut pas être projeté)
+    
+    Returns:
+        Couple (dimension, type), chaque valeur valant None si elle est absente
+    """
+    dimension = None
+    type_instance = None
+    
+    if taille == 0:
+        return dimension, type_instance
+    
+    with open(chemin_fichier, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contenu:
+            fin_entete = contenu.find(b'_SECTION')
+            entete = contenu[:fin_entete] if fin_entete != -1 else contenu[:]
+    
+    for ligne in entete.splitlines():
+        ligne = ligne.strip()
+        if ligne.startswith(b'DIMENSION'):
+            dimension = int(ligne.split(b':')[1].strip())
+        elif ligne.startswith(b'TYPE'):
+            type_instance = ligne.split(b':')[1].strip().decode()
+    
+    return dimension, type_instance
+
+
+def _charger_cache_info(dossier):
+    """
+    Charge (une seule fois par exécution) le cache des informations d'un dossier.
+    
+    Un cache absent ou illisible est simplement ignoré.
+    
+    Args:
+        dossier: Dossier contenant les instances
+    
+    Returns:
+        Dictionnaire {nom_fichier: entrée} (modifiable)
+    """
+    dossier = os.path.normpath(dossier)
+    if dossier not in _caches_info:
+        try:
+            with open(os.path.join(dossier, FICHIER_CACHE_INFO), 'r') as f:
+                cache = json.load(f)
+            if not isinstance(cache, dict):
+                cache = {}
+        except (OSError, ValueError):
+            cache = {}
+        _caches_info[dossier] = cache
+    
+    return _caches_info[dossier]
+
+
+def _enregistrer_cache_info(dossier):
+    """
+    Écrit le cache des informations d'un dossier s'il a été complété.
+    
+    Le cache n'est qu'une optimisation : une erreur d'écriture (dossier en
+    lecture seule par exemple) est ignorée.
+    
+    Args:
+        dossier: Dossier contenant les instances
+    """
+    dossier = os.path.normpath(dossier)
+    if dossier not in _caches_modifies:
+        return
+    
+    try:
+        with open(os.path.join(dossier, FICHIER_CACHE_INFO), 'w') as f:
+            json.dump(_caches_info[dossier], f)
+        _caches_modifies.discard(dossier)
+    except OSError:
+        pass
+
+
+def obtenir_infos_instances(instances, dossier):
+    """
+    Obtient les informations de plusieurs instances d'un même dossier.
+    
+    La lecture des en-têtes est surtout faite d'attente sur le disque : les
+    fichiers sont donc lus en parallèle par un groupe de fils d'exécution
+    (ThreadPoolExecutor), puis le cache du dossier est enregistré une seule fois.
+    
+    Args:
+        instances: Liste des chemins vers les fichiers .tsp
+        dossier: Dossier contenant les instances
+    
+    Returns:
+        Liste des informations (voir obtenir_info_instance), dans l'ordre de instances
+    """
+    if len(instances) == 0:
+        return []
+    
+    # Chargement du cache avant de lancer les fils d'exécution,
+    # pour qu'ils complètent tous le même dictionnaire
+    _charger_cache_info(dossier)
+    
+    def obtenir_info(instance):
+        return obtenir_info_instance(instance, enregistrer_cache=False)
+    
+    with ThreadPoolExecutor(max_workers=min(NOMBRE_FILS_LECTURE, len(instances))) as executeur:
+        infos = list(executeur.map(obtenir_info, instances))
+    
+    # Un seul enregistrement du cache pour tout le dossier
+    _enregistrer_cache_info(dossier)
+    
+    return infos
+
+
 def lister_instances_par_taille(dossier='donnees/tsplib', taille_min=None, taille_max=None):
     """
     Liste les instances filtrées par taille.
@@ -69,15 +233,14 @@ def lister_instances_par_taille(dossier='donnees/tsplib', taille_min=None, taill
         dossier: Chemin vers le dossier contenant les instances
         taille_min: Taille minimale (nombre de points)
         taille_max: Taille maximale (nombre de points)
-        
+    
     Returns:
         Liste des instances correspondant aux critères
     """
     toutes_instances = lister_instances_tsplib(dossier)
     instances_filtrees = []
     
-    for instance in toutes_instances:
-        info = obtenir_info_instance(instance)
+    for instance, info in zip(toutes_instances, obtenir_infos_instances(toutes_instances, dossier)):
         dimension = info['dimension']
         
         if dimension is None:
@@ -110,8 +273,7 @@ def afficher_instances_disponibles(dossier='donnees/tsplib'):
     moyennes = []  # 50 < n <= 200
     grandes = []  # n > 200
     
-    for instance in instances:
-        info = obtenir_info_instance(instance)
+    for info in obtenir_infos_instances(instances, dossier):
         dimension = info['dimension']
         
         if dimension is None:
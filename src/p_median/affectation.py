@@ -1,7 +1,8 @@
 # Affectation des points aux stations pour le problème p-médian
 # Chaque point non station est affecté à la station la plus proche
 
-from src.calcul_distances import creer_matrice_distances, obtenir_distance
+import numpy as np
+from src.lecture_tsp import Points
 
 
 def affecter_points_aux_stations(points, stations, distances):
@@ -23,42 +24,114 @@ def affecter_points_aux_stations(points, stations, distances):
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         stations: Liste des identifiants des stations sélectionnées
-        distances: Dictionnaire des distances créé par creer_matrice_distances
-        
+        distances: Matrice des distances créée par creer_matrice_distances
+    
     Returns:
         Dictionnaire où affectations[id_point] = id_station
     """
-    # Conversion en ensemble pour accès rapide
-    stations_set = set(stations)
+    identifiants, stations_plus_proches, _ = _stations_plus_proches(points, stations, distances)
+    return _construire_affectations(identifiants, stations_plus_proches, stations)
+
+
+def _stations_plus_proches(points, stations, distances):
+    """
+    Cherche la station la plus proche de chaque point et la distance associée.
     
-    # Dictionnaire des affectations
-    affectations = {}
+    L'indice du minimum (argmin) et la valeur du minimum sont obtenus à partir
+    de la même sous-matrice (points x stations) : le coût d'affectation est
+    la somme de ces minima, sans relire les distances une deuxième fois.
     
-    # Pour chaque point
-    for point in points:
-        id_point = point[0]
-        
-        # Si le point est une station, il s'affecte à lui-même
-        if id_point in stations_set:
-            affectations[id_point] = id_point
-        else:
-            # Recherche de la station la plus proche
-            station_plus_proche = None
-            distance_minimale = float('inf')
-            
-            for id_station in stations:
-                distance = obtenir_distance(distances, id_point, id_station)
-                
-                if distance < distance_minimale:
-                    distance_minimale = distance
-                    station_plus_proche = id_station
-            
-            # Affectation du point à la station la plus proche
-            affectations[id_point] = station_plus_proche
+    Args:
+        points: Liste de tuples (id, x, y) représentant tous les points
+        stations: Liste des identifiants des stations sélectionnées
+        distances: Matrice des distances créée par creer_matrice_distances
+    
+    Returns:
+        Tuple (identifiants, stations_plus_proches, distances_minimales) :
+        liste des identifiants des points, liste de la station la plus proche
+        de chaque point et tableau numpy des distances correspondantes
+    """
+    # Identifiants des points et colonnes des stations dans la matrice
+    identifiants = _identifiants_points(points)
+    colonnes = distances.indices_de(stations)
+    
+    # Recherche de la station la plus proche de chaque point, en une seule
+    # opération : argmin sur la sous-matrice (points x stations)
+    # (en cas d'égalité, argmin garde la première station, comme la boucle d'origine)
+    sous_matrice = _sous_matrice_stations(points, identifiants, colonnes, distances)
+    plus_proches = sous_matrice.argmin(axis=1)
+    distances_minimales = np.take_along_axis(sous_matrice, plus_proches[:, np.newaxis], axis=1).ravel()
+    stations_plus_proches = np.asarray(stations, dtype=np.intp)[plus_proches].tolist()
+    
+    return identifiants, stations_plus_proches, distances_minimales
+
+
+def _construire_affectations(identifiants, stations_plus_proches, stations):
+    """
+    Construit le dictionnaire des affectations.
+    
+    Args:
+        identifiants: Liste des identifiants des points
+        stations_plus_proches: Station la plus proche de chaque point
+        stations: Liste des identifiants des stations sélectionnées
+    
+    Returns:
+        Dictionnaire où affectations[id_point] = id_station
+    """
+    affectations = dict(zip(identifiants, stations_plus_proches))
+    
+    # Si le point est une station, il s'affecte à lui-même
+    # (sa distance minimale est nulle dans tous les cas).
+    # L'argmin le fait déjà sauf pour des points confondus (a280, ali535) :
+    # deux stations à distance nulle, la première l'emporte. On corrige ces
+    # cas en une seule mise à jour du dictionnaire, sans boucle Python
+    affectations.update(zip(stations, stations))
     
     return affectations
 
 
+def _identifiants_points(points):
+    """
+    Retourne la liste des identifiants des points.
+    
+    Args:
+        points: Objet Points ou liste de tuples (id, x, y)
+    
+    Returns:
+        Liste des identifiants (pour un objet Points, la liste mémorisée : à ne pas modifier)
+    """
+    if isinstance(points, Points):
+        return points.identifiants
+    return [point[0] for point in points]
+
+
+def _sous_matrice_stations(points, identifiants, colonnes, distances):
+    """
+    Extrait la sous-matrice (points x stations) des distances.
+    
+    Cas courant : les points sont ceux à partir desquels la matrice a été
+    créée, dans le même ordre. On prend alors directement les colonnes des
+    stations, sans passer par le dictionnaire id -> ligne pour chaque point.
+    
+    Args:
+        points: Objet Points ou liste de tuples (id, x, y)
+        identifiants: Liste des identifiants des points
+        colonnes: Indices des colonnes des stations dans la matrice
+        distances: Matrice des distances créée par creer_matrice_distances
+    
+    Returns:
+        Tableau numpy (nombre de points, nombre de stations)
+    """
+    # Matrice créée à partir de ces points : elle partage leur dictionnaire
+    # d'indices, ce qui évite de comparer les identifiants un par un
+    if isinstance(points, Points) and (distances.indices is points.indices or
+                                       np.array_equal(points.ids, distances.identifiants)):
+        return distances.matrice[:, colonnes]
+    
+    lignes = distances.indices_de(identifiants)
+    return distances.matrice[np.ix_(lignes, colonnes)]
+
+
 def calculer_cout_affectation(points, stations, distances):
     """
     Calcule le coût total d'affectation pour une sélection de stations.
@@ -69,26 +142,14 @@ def calculer_cout_affectation(points, stations, distances):
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         stations: Liste des identifiants des stations sélectionnées
-        distances: Dictionnaire des distances créé par creer_matrice_distances
-        
+        distances: Matrice des distances créée par creer_matrice_distances
+    
     Returns:
         Coût total d'affectation (somme des distances)
     """
-    # Affectation des points aux stations
-    affectations = affecter_points_aux_stations(points, stations, distances)
-    
-    # Calcul du coût total
-    cout_total = 0.0
-    
-    for point in points:
-        id_point = point[0]
-        id_station = affectations[id_point]
-        
-        # Ajout de la distance d'affectation
-        distance = obtenir_distance(distances, id_point, id_station)
-        cout_total += distance
-    
-    return cout_total
+    # Somme des distances minimales, sans construire les affectations
+    _, _, distances_minimales = _stations_plus_proches(points, stations, distances)
+    return float(distances_minimales.sum())
 
 
 def obtenir_affectations_et_cout(points, stations, distances):
@@ -101,23 +162,84 @@ def obtenir_affectations_et_cout(points, stations, distances):
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         stations: Liste des identifiants des stations sélectionnées
-        distances: Dictionnaire des distances créé par creer_matrice_distances
-        
+        distances: Matrice des distances créée par creer_matrice_distances
+    
     Returns:
         Tuple (affectations, cout_total)
     """
-    # Affectation des points aux stations
-    affectations = affecter_points_aux_stations(points, stations, distances)
+    # Stations les plus proches et distances, obtenues en une seule passe
+    identifiants, stations_plus_proches, distances_minimales = _stations_plus_proches(
+        points, stations, distances
+    )
     
-    # Calcul du coût total
-    cout_total = 0.0
+    affectations = _construire_affectations(identifiants, stations_plus_proches, stations)
+    cout_total = float(distances_minimales.sum())
     
-    for point in points:
-        id_point = point[0]
+    return affectations, cout_total
+
+
+def evaluer_echange_station(stations, affectations, distances_affectation,
+                            station_retiree, station_ajoutee, distances):
+    """
+    Évalue la variation du coût d'affectation pour l'échange d'une station.
+    
+    Lorsqu'une station est remplacée par une autre, seuls deux groupes
+    de points peuvent changer d'affectation :
+    - les points affectés à la station retirée, qu'il faut réaffecter
+      à la station restante la plus proche
+    - les points plus proches de la station ajoutée que de leur
+      station actuelle
+    Les autres points gardent leur affectation. On ne reconstruit donc
+    pas les affectations : on renvoie seulement la variation de coût et
+    la liste des points qui changent de station.
+    
+    Args:
+        stations: Liste des identifiants des stations après l'échange
+        affectations: Affectations avant l'échange (non modifiées)
+        distances_affectation: Dictionnaire id_point -> distance à sa station actuelle
+        station_retiree: Identifiant de la station retirée
+        station_ajoutee: Identifiant de la station ajoutée
+        distances: Matrice des distances créée par creer_matrice_distances
+    
+    Returns:
+        Tuple (delta_cout, modifications) où modifications est un dictionnaire
+        id_point -> (nouvelle_station, nouvelle_distance)
+    """
+    delta_cout = 0.0
+    modifications = {}
+    
+    # Accès direct aux lignes de la matrice (listes Python) plutôt qu'un appel
+    # à obtenir_distance par point : la matrice est symétrique, la ligne de la
+    # station ajoutée donne sa distance à chaque point
+    indices = distances.indices
+    lignes = distances.lignes
+    ligne_ajoutee = lignes[indices[station_ajoutee]]
+    colonnes_stations = [(id_candidate, indices[id_candidate]) for id_candidate in stations]
+    
+    for id_point, distance_actuelle in distances_affectation.items():
         id_station = affectations[id_point]
         
-        # Ajout de la distance d'affectation
-        distance = obtenir_distance(distances, id_point, id_station)
-        cout_total += distance
+        if id_station == station_retiree:
+            # La station a disparu : recherche complète parmi les stations restantes
+            station_plus_proche = None
+            distance_minimale = float('inf')
+            ligne_point = lignes[indices[id_point]]
+            
+            for id_candidate, colonne in colonnes_stations:
+                distance = ligne_point[colonne]
+                
+                if distance < distance_minimale:
+                    distance_minimale = distance
+                    station_plus_proche = id_candidate
+            
+            modifications[id_point] = (station_plus_proche, distance_minimale)
+            delta_cout += distance_minimale - distance_actuelle
+        else:
+            # Seule la station ajoutée peut faire mieux que la station actuelle
+            distance_ajoutee = ligne_ajoutee[indices[id_point]]
+            
+            if distance_ajoutee < distance_actuelle:
+                modifications[id_point] = (station_ajoutee, distance_ajoutee)
+                delta_cout += distance_ajoutee - distance_actuelle
     
-    return affectations, cout_total
+    return delta_cout, modifications
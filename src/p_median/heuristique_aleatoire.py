@@ -3,6 +3,8 @@
 
 import random
 
+from src.lecture_tsp import Points
+
 
 def selectionner_stations_aleatoire(points, p):
     """
@@ -24,7 +26,7 @@ def selectionner_stations_aleatoire(points, p):
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         p: Nombre de stations à sélectionner
-        
+    
     Returns:
         Liste des identifiants des stations sélectionnées
     """
@@ -32,12 +34,15 @@ def selectionner_stations_aleatoire(points, p):
     if p <= 0:
         return []
     
-    if p > len(points):
-        # Si p est plus grand que le nombre de points, on prend tous les points
-        return [point[0] for point in points]
+    # Extraction de tous les identifiants (directement depuis le tableau numpy si possible)
+    if isinstance(points, Points):
+        identifiants = points.ids.tolist()
+    else:
+        identifiants = [point[0] for point in points]
     
-    # Extraction de tous les identifiants
-    identifiants = [point[0] for point in points]
+    if p > len(identifiants):
+        # Si p est plus grand que le nombre de points, on prend tous les points
+        return identifiants
     
     # La station 1 est toujours incluse (contrainte du problème)
     stations_selectionnees = [1]
@@ -47,10 +52,12 @@ def selectionner_stations_aleatoire(points, p):
         return stations_selectionnees
     
     # Retrait de la station 1 de la liste des candidats
-    identifiants_restants = [id_point for id_point in identifiants if id_point != 1]
+    # (la liste vient d'être construite, on peut la modifier en place)
+    if 1 in identifiants:
+        identifiants.remove(1)
     
     # Sélection aléatoire de (p-1) stations supplémentaires
-    stations_supplementaires = random.sample(identifiants_restants, p - 1)
+    stations_supplementaires = random.sample(identifiants, p - 1)
     
     # Ajout des stations supplémentaires
     stations_selectionnees.extend(stations_supplementaires)
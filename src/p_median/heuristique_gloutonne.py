@@ -2,7 +2,46 @@
 # Utilise une grille pour répartir les stations de manière géographique
 
 import math
-from src.calcul_distances import distance_euclidienne
+
+import numpy as np
+from src.acceleration import njit, NUMBA_DISPONIBLE
+from src.lecture_tsp import Points, creer_points
+
+
+@njit(cache=True)
+def _point_libre_plus_proche_nb(xs, ys, centre_x, centre_y, disponibles):
+    """
+    Version compilée (Numba) de la recherche du point disponible le plus proche d'un centre.
+    
+    Parcourt les points une seule fois sans créer de tableau intermédiaire
+    (pas de tableau de distances ni de masque à chaque centre).
+    
+    Args:
+        xs: Tableau float64 des abscisses des points
+        ys: Tableau float64 des ordonnées des points
+        centre_x: Abscisse du centre
+        centre_y: Ordonnée du centre
+        disponibles: Tableau booléen, False pour les points déjà sélectionnés
+    
+    Returns:
+        Indice du point disponible le plus proche (-1 si aucun point n'est disponible)
+    """
+    meilleur_indice = -1
+    meilleure_distance_carre = np.inf
+    
+    for i in range(xs.shape[0]):
+        if not disponibles[i]:
+            continue
+        dx = xs[i] - centre_x
+        dy = ys[i] - centre_y
+        # Distance au carré : la racine ne change pas le classement des points
+        distance_carre = dx * dx + dy * dy
+        # Inégalité stricte : en cas d'égalité, le premier point est gardé
+        if distance_carre < meilleure_distance_carre:
+            meilleure_distance_carre = distance_carre
+            meilleur_indice = i
+    
+    return meilleur_indice
 
 
 def selectionner_stations_grille(points, p):
@@ -26,7 +65,7 @@ def selectionner_stations_grille(points, p):
     Args:
         points: Liste de tuples (id, x, y) représentant tous les points
         p: Nombre de stations à sélectionner
-        
+    
     Returns:
         Liste des identifiants des stations sélectionnées
     """
@@ -45,14 +84,14 @@ def selectionner_stations_grille(points, p):
     if p == 1:
         return stations_selectionnees
     
-    # Calcul des bornes de l'espace (min et max en x et y)
-    coordonnees_x = [point[1] for point in points]
-    coordonnees_y = [point[2] for point in points]
+    # Coordonnées de tous les points sous forme de tableaux numpy
+    if not isinstance(points, Points):
+        points = creer_points([point[0] for point in points],
+                              [(point[1], point[2]) for point in points])
     
-    x_min = min(coordonnees_x)
-    x_max = max(coordonnees_x)
-    y_min = min(coordonnees_y)
-    y_max = max(coordonnees_y)
+    # Calcul des bornes de l'espace (min et max en x et y), en une réduction par axe
+    x_min, y_min = points.xy.min(axis=0).tolist()
+    x_max, y_max = points.xy.max(axis=0).tolist()
     
     # Calcul de la taille de la grille
     # On veut approximativement p-1 rectangles (car la station 1 est déjà incluse)
@@ -67,45 +106,131 @@ def selectionner_stations_grille(points, p):
     largeur_cellule = (x_max - x_min) / nombre_colonnes
     hauteur_cellule = (y_max - y_min) / nombre_lignes
     
-    # Création des centres des rectangles de la grille
-    centres_grille = []
-    for i in range(nombre_lignes):
-        for j in range(nombre_colonnes):
-            # Calcul du centre du rectangle (i, j)
-            centre_x = x_min + (j + 0.5) * largeur_cellule
-            centre_y = y_min + (i + 0.5) * hauteur_cellule
-            centres_grille.append((centre_x, centre_y))
+    # Création des centres des rectangles de la grille, ligne par ligne :
+    # le centre du rectangle (i, j) est (x_min + (j + 0.5) * largeur, y_min + (i + 0.5) * hauteur)
+    centres_x = x_min + (np.arange(nombre_colonnes) + 0.5) * largeur_cellule
+    centres_y = y_min + (np.arange(nombre_lignes) + 0.5) * hauteur_cellule
+    grille_x, grille_y = np.meshgrid(centres_x, centres_y)
     
     # Limitation au nombre de stations restantes
-    centres_grille = centres_grille[:nombre_stations_restantes]
+    centres_grille = np.column_stack([grille_x.ravel(), grille_y.ravel()])[:nombre_stations_restantes].tolist()
     
-    # Pour chaque centre de grille, trouver le point le plus proche
-    identifiants_deja_selectionnes = set([1])
+    # Les distances d'un centre à tous les points sont calculées d'un coup
+    identifiants = points.identifiants
+    xs = points.xy[:, 0]
+    ys = points.xy[:, 1]
+    
+    # Points encore disponibles (les points déjà sélectionnés sont ignorés)
+    disponibles = points.ids != 1
     
+    # Pour chaque centre de grille, trouver le point le plus proche
     for centre_x, centre_y in centres_grille:
-        point_centre = (0, centre_x, centre_y)  # ID fictif pour le calcul
+        # Avec Numba, la recherche est faite par la version compilée
+        if NUMBA_DISPONIBLE:
+            indice = _point_libre_plus_proche_nb(xs, ys, centre_x, centre_y, disponibles)
+            
+            # Plus de point disponible : on ne peut plus ajouter de station
+            if indice < 0:
+                break
+            
+            stations_selectionnees.append(identifiants[indice])
+            disponibles[indice] = False
+            continue
         
-        meilleur_point = None
-        meilleure_distance = float('inf')
+        # Plus de point disponible : on ne peut plus ajouter de station
+        if not disponibles.any():
+            break
+        
+        # Distance au carré du centre à tous les points : on ne fait que comparer
+        # les distances, la racine carrée est donc inutile.
+        # Les points déjà sélectionnés sont placés à l'infini
+        dx = xs - centre_x
+        dy = ys - centre_y
+        distances_centre = dx * dx + dy * dy
+        distances_centre[~disponibles] = np.inf
         
         # Recherche du point le plus proche du centre
-        for point in points:
-            id_point = point[0]
-            
-            # On ignore les points déjà sélectionnés
-            if id_point in identifiants_deja_selectionnes:
-                continue
-            
-            # Calcul de la distance au centre
-            distance = distance_euclidienne(point_centre, point)
-            
-            if distance < meilleure_distance:
-                meilleure_distance = distance
-                meilleur_point = id_point
+        # (en cas d'égalité, argmin garde le premier point, comme la boucle d'origine)
+        indice = int(distances_centre.argmin())
         
         # Ajout du meilleur point trouvé
-        if meilleur_point is not None:
-            stations_selectionnees.append(meilleur_point)
-            identifiants_deja_selectionnes.add(meilleur_point)
+        stations_selectionnees.append(identifiants[indice])
+        disponibles[indice] = False
+    
+    return stations_selectionnees
+
+
+def selectionner_stations_eloignees(points, p):
+    """
+    Sélectionne p stations par la méthode du point le plus éloigné.
+    
+    On part de la station 1, puis on ajoute à chaque étape le point le plus
+    éloigné des stations déjà choisies (c'est-à-dire dont la distance à la
+    station la plus proche est la plus grande). On garde pour chaque point
+    sa distance à la station la plus proche, mise à jour avec un seul
+    np.minimum par station ajoutée : O(p·n) sans construire de grille.
+    
+    Avantages :
+    - Les stations couvrent toute l'étendue des points, même si la
+      répartition des points est très irrégulière (pas de rectangle vide)
+    - Rapide à calculer
+    
+    Inconvénients :
+    - Ne garantit pas l'optimalité
+    - Favorise les points isolés en bordure de l'instance
+    
+    Args:
+        points: Liste de tuples (id, x, y) représentant tous les points
+        p: Nombre de stations à sélectionner
+    
+    Returns:
+        Liste des identifiants des stations sélectionnées
+    """
+    # Vérification que p est valide
+    if p <= 0:
+        return []
+    
+    if p > len(points):
+        # Si p est plus grand que le nombre de points, on prend tous les points
+        return [point[0] for point in points]
+    
+    # La station 1 est toujours incluse (contrainte du problème)
+    stations_selectionnees = [1]
+    
+    # Si p = 1, on retourne juste la station 1
+    if p == 1:
+        return stations_selectionnees
+    
+    # Coordonnées de tous les points sous forme de tableaux numpy
+    if not isinstance(points, Points):
+        points = creer_points([point[0] for point in points],
+                              [(point[1], point[2]) for point in points])
+    
+    identifiants = points.identifiants
+    xs = points.xy[:, 0]
+    ys = points.xy[:, 1]
+    
+    # Distance au carré de chaque point à la station la plus proche
+    # (on ne fait que comparer les distances : la racine carrée est inutile).
+    # Au départ, la seule station est la station 1
+    indice_station = points.indices[1]
+    dx = xs - xs[indice_station]
+    dy = ys - ys[indice_station]
+    distance_stations = dx * dx + dy * dy
+    
+    # Les stations déjà choisies sont exclues (valeur négative) : sans cela,
+    # des points confondus pourraient faire choisir deux fois le même point
+    distance_stations[indice_station] = -1.0
+    
+    for _ in range(p - 1):
+        # Point le plus éloigné des stations déjà choisies
+        indice_station = int(distance_stations.argmax())
+        stations_selectionnees.append(identifiants[indice_station])
+        
+        # Mise à jour des distances avec la nouvelle station
+        dx = xs - xs[indice_station]
+        dy = ys - ys[indice_station]
+        np.minimum(distance_stations, dx * dx + dy * dy, out=distance_stations)
+        distance_stations[indice_station] = -1.0
     
     return stations_selectionnees
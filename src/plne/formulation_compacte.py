@@ -1,23 +1,35 @@
 # Modèle PLNE compact pour le problème anneau-étoile
 # Formulation exacte utilisant la programmation linéaire en nombres entiers
 
+import os
+import time
+
+import numpy as np
 import pulp
 from src.calcul_distances import creer_matrice_distances
+from src.heuristiques.solution_initiale import construire_solution_initiale
+
+
+# Nombre de fils d'exécution de CBC : l'arbre de recherche est exploré en
+# parallèle sur tous les cœurs disponibles
+NOMBRE_FILS_CBC = os.cpu_count() or 1
 
 
-def resoudre_plne(points, p, alpha=0.5, timeout=300):
+def resoudre_plne(points, p, alpha=0.5, timeout=300, distances=None):
     """
     Résout le problème anneau-étoile avec une formulation PLNE compacte.
     
     Variables :
     - y[i] : variable binaire, vaut 1 si le point i est une station
     - x[i,j] : variable binaire, vaut 1 si l'arête (i,j) est dans le cycle (i < j)
-    - z[i,j] : variable binaire, vaut 1 si le point i est affecté à la station j
+    - w[i] : variable continue, distance du point i à sa station la plus proche
     
     Contraintes :
     1. Degré : chaque station a exactement 2 arêtes dans le cycle
-    2. Affectation : chaque point est affecté à exactement une station
-    3. Connexité : le cycle est connexe (contraintes de sous-tour élimination)
+    2. Affectation : w[i] est au moins la distance de i à la station ouverte
+       la plus proche (formulation "rayon", sans variables z[i,j])
+    3. Connexité : le cycle est connexe (contraintes de sous-tour élimination
+       de Dantzig-Fulkerson-Johnson, ajoutées seulement quand elles sont violées)
     4. Cardinalité : exactement p stations sont sélectionnées
     5. Station 1 : la station 1 est toujours sélectionnée
     
@@ -28,7 +40,7 @@ def resoudre_plne(points, p, alpha=0.5, timeout=300):
     - L'exploration de l'arbre de recherche garantit l'optimalité (si résolu)
     
     Limites de taille d'instance :
-    - Le nombre de variables est O(n²) où n = nombre de points
+    - Le nombre de variables est O(n²) où n = nombre de points (arêtes x[i,j])
     - Le nombre de contraintes est O(n²)
     - Pour n > 20, le temps de résolution peut devenir très long
     - Pour n > 50, la résolution exacte devient souvent impraticable
@@ -39,12 +51,15 @@ def resoudre_plne(points, p, alpha=0.5, timeout=300):
         p: Nombre de stations à sélectionner
         alpha: Coefficient de pondération (0 <= alpha <= 1)
         timeout: Temps maximum de résolution en secondes
-        
+        distances: Matrice des distances déjà calculée (optionnel).
+                   Si None, elle est créée avec creer_matrice_distances
+    
     Returns:
         Dictionnaire contenant la solution optimale ou None si non résolu
     """
-    # Création de la matrice des distances
-    distances = creer_matrice_distances(points)
+    # Création de la matrice des distances (si elle n'est pas fournie)
+    if distances is None:
+        distances = creer_matrice_distances(points)
     
     # Extraction des identifiants
     identifiants = [point[0] for point in points]
@@ -62,24 +77,25 @@ def resoudre_plne(points, p, alpha=0.5, timeout=300):
     y = pulp.LpVariable.dicts("y", identifiants, cat='Binary')
     
     # x[i,j] : 1 si l'arête (i,j) est dans le cycle (i < j)
+    # Les arêtes ne sont pas orientées : un cycle, ses deux sens de parcours et
+    # tous ses points de départ correspondent à la même solution x. Il n'y a
+    # donc pas de solutions symétriques à éliminer sur l'ordre de parcours
     x = {}
     for i in identifiants:
         for j in identifiants:
             if i < j:
                 x[(i, j)] = pulp.LpVariable(f"x_{i}_{j}", cat='Binary')
     
-    # z[i,j] : 1 si le point i est affecté à la station j
-    z = {}
-    for i in identifiants:
-        for j in identifiants:
-            z[(i, j)] = pulp.LpVariable(f"z_{i}_{j}", cat='Binary')
+    # w[i] : distance du point i à sa station la plus proche
+    # (remplace les n² variables d'affectation z[i,j] par n variables continues)
+    w = pulp.LpVariable.dicts("w", identifiants, lowBound=0)
     
     # Fonction objectif
     # Minimiser : alpha * longueur_cycle + (1-alpha) * cout_affectation
-    cout_cycle = pulp.lpSum([distances[(i, j)] * x[(i, j)] 
-                            for i in identifiants for j in identifiants if i < j])
-    cout_affectation = pulp.lpSum([distances[(i, j)] * z[(i, j)] 
-                                  for i in identifiants for j in identifiants])
+    # L'expression est créée directement à partir du dictionnaire
+    # variable -> coefficient, sans former chaque terme d * x séparément
+    cout_cycle = pulp.LpAffineExpression({variable: distances[arete] for arete, variable in x.items()})
+    cout_affectation = pulp.lpSum([w[i] for i in identifiants])
     
     probleme += alpha * cout_cycle + (1 - alpha) * cout_affectation
     
@@ -104,65 +120,90 @@ def resoudre_plne(points, p, alpha=0.5, timeout=300):
         # Si i est une station, il a exactement 2 arêtes
         probleme += pulp.lpSum(arêtes_incidentes) == 2 * y[i]
     
-    # 4. Contraintes d'affectation : chaque point est affecté à exactement une station
-    for i in identifiants:
-        probleme += pulp.lpSum([z[(i, j)] for j in identifiants]) == 1
-    
-    # 5. Contraintes logiques : un point ne peut être affecté qu'à une station
+    # 4. Contraintes d'affectation (formulation "rayon") : pour tout point i
+    # et toute distance d(i,j),
+    #     w[i] >= d(i,j) - somme sur k tel que d(i,k) < d(i,j) de (d(i,j) - d(i,k)) * y[k]
+    # Si une station k est plus proche de i que d(i,j), le membre de droite
+    # est au plus d(i,k) : la plus grande de ces bornes vaut exactement la
+    # distance de i à sa station la plus proche (atteinte pour j = cette station)
+    # Chaque contrainte est écrite w[i] + somme des (d(i,j) - d(i,k)) * y[k] >= d(i,j)
+    # et son membre de gauche est créé en une fois à partir des couples
+    # (variable, coefficient) : ce sont O(n³) termes au total
+    lignes = distances.lignes
+    indices = distances.indices
     for i in identifiants:
-        for j in identifiants:
-            probleme += z[(i, j)] <= y[j]
-    
-    # 6. Contraintes de sous-tour élimination (MTZ - Miller-Tucker-Zemlin)
-    # Variables auxiliaires u[i] pour l'ordre de visite (seulement pour les stations)
-    u = pulp.LpVariable.dicts("u", identifiants, lowBound=0, upBound=n, cat='Integer')
+        ligne_i = lignes[indices[i]]
+        
+        # Distances de i triées : les k plus proches que j sont ceux qui le précèdent
+        voisins_tries = sorted(identifiants, key=lambda k: ligne_i[indices[k]])
+        distances_triees = [ligne_i[indices[k]] for k in voisins_tries]
+        for position, j in enumerate(voisins_tries):
+            distance_ij = distances_triees[position]
+            termes = {w[i]: 1}
+            for k, distance_ik in zip(voisins_tries[:position], distances_triees):
+                if distance_ik < distance_ij:
+                    termes[y[k]] = distance_ij - distance_ik
+            probleme += pulp.LpConstraint(pulp.LpAffineExpression(termes),
+                                          sense=pulp.LpConstraintGE, rhs=distance_ij)
     
-    # u[1] = 1 si la station 1 est sélectionnée
-    probleme += u[1] == y[1]
+    # 5. Contraintes de sous-tour élimination (Dantzig-Fulkerson-Johnson)
+    # Elles sont en nombre exponentiel : on ne les ajoute qu'au besoin.
+    # On résout, on cherche les sous-tours dans la solution entière obtenue,
+    # on ajoute les coupes correspondantes et on résout à nouveau, jusqu'à
+    # obtenir un cycle unique (voir ajouter_coupes_sous_tours)
     
-    # Pour chaque arête (i,j) dans le cycle, u[j] >= u[i] + 1
-    # Mais seulement si i et j sont des stations ET que l'arête est utilisée
-    for i in identifiants:
-        for j in identifiants:
-            if i != j and i < j:
-                # Si l'arête (i,j) est dans le cycle ET que i et j sont stations,
-                # alors u[j] >= u[i] + 1
-                # Utilisation de la big-M method
-                M = n
-                # Si x[(i,j)] = 1 et y[i] = 1 et y[j] = 1, alors u[j] >= u[i] + 1
-                probleme += u[j] >= u[i] + 1 - M * (1 - x[(i, j)]) - M * (1 - y[i]) - M * (1 - y[j])
-                
-                # Si i n'est pas une station, u[i] = 0
-                probleme += u[i] <= M * y[i]
-                probleme += u[j] <= M * y[j]
+    # Solution de départ : l'heuristique grille + plus proche voisin + 2-opt
+    # donne rapidement une solution réalisable (un seul cycle). Fournie au
+    # solveur, elle sert de borne supérieure dès le début de la recherche
+    solution_depart = construire_solution_initiale(points, p, methode_selection='grille',
+                                                   ameliorer_cycle=True, alpha=alpha,
+                                                   distances=distances)
     
     # Résolution
     try:
-        # Utilisation du solveur par défaut (CBC si disponible)
-        solveur = pulp.PULP_CBC_CMD(timeLimit=timeout, msg=1)
-        probleme.solve(solveur)
+        debut = time.time()
         
-        # Vérification du statut
-        statut = pulp.LpStatus[probleme.status]
+        while True:
+            # La résolution précédente a remplacé les valeurs des variables :
+            # on redonne la solution de départ, qui respecte toutes les coupes
+            fixer_valeurs_initiales(solution_depart, identifiants, x, y, w, distances)
+            
+            # Résolution par CBC, avec le temps restant sur le temps total autorisé
+            temps_restant = max(1, timeout - (time.time() - debut))
+            probleme.solve(creer_solveur(temps_restant))
+            
+            # Vérification du statut
+            statut = pulp.LpStatus[probleme.status]
+            if statut != 'Optimal':
+                break
+            
+            # Sous-tours de la solution entière : si aucune coupe n'est
+            # ajoutée, le cycle est connexe et la solution est optimale
+            if not ajouter_coupes_sous_tours(probleme, x, y):
+                break
+            
+            if time.time() - debut >= timeout:
+                statut = 'Not Solved'
+                break
         
         if statut == 'Optimal':
             # Extraction de la solution
-            stations = [i for i in identifiants if pulp.value(y[i]) > 0.5]
+            stations = cles_selectionnees(y)
             
             # Extraction du cycle
-            arêtes_cycle = [(i, j) for i in identifiants for j in identifiants 
-                          if i < j and pulp.value(x[(i, j)]) > 0.5]
+            arêtes_cycle = cles_selectionnees(x)
             
             # Construction du cycle ordonné
             cycle = construire_cycle_depuis_aretes(stations, arêtes_cycle)
             
-            # Extraction des affectations
+            # Affectations : chaque point va à sa station la plus proche
+            # (c'est la distance que représente w[i]). Comme pour les
+            # heuristiques, chaque station est affectée à elle-même, même si
+            # une autre station a les mêmes coordonnées (distance 0)
             affectations = {}
             for i in identifiants:
-                for j in identifiants:
-                    if pulp.value(z[(i, j)]) > 0.5:
-                        affectations[i] = j
-                        break
+                affectations[i] = min(stations, key=lambda j: distances[(i, j)])
+            affectations.update(zip(stations, stations))
             
             # Calcul des coûts
             longueur_cycle = sum([distances[(i, j)] for i, j in arêtes_cycle])
@@ -184,12 +225,164 @@ def resoudre_plne(points, p, alpha=0.5, timeout=300):
         else:
             print(f"Statut de résolution : {statut}")
             return None
-            
+    
     except Exception as e:
         print(f"Erreur lors de la résolution : {e}")
         return None
 
 
+def creer_solveur(temps_limite):
+    """
+    Crée le solveur CBC utilisé par les formulations PLNE.
+    
+    PuLP écrit le modèle dans un fichier MPS et lance l'exécutable CBC ;
+    les options lui sont transmises en ligne de commande. Le solveur part
+    de la solution fournie par setInitialValue (warmStart) et explore
+    l'arbre de recherche avec NOMBRE_FILS_CBC fils d'exécution.
+    Aucune tolérance d'écart n'est fixée : la résolution reste exacte.
+    
+    Args:
+        temps_limite: Temps maximum de résolution en secondes
+    
+    Returns:
+        Solveur PuLP (PULP_CBC_CMD)
+    """
+    return pulp.PULP_CBC_CMD(timeLimit=temps_limite, msg=1, warmStart=True,
+                             threads=NOMBRE_FILS_CBC)
+
+
+def fixer_valeurs_initiales(solution, identifiants, x, y, w, distances):
+    """
+    Donne aux variables du modèle les valeurs d'une solution heuristique.
+    
+    Ces valeurs sont transmises à CBC comme solution de départ
+    (option warmStart du solveur).
+    
+    Args:
+        solution: Dictionnaire de solution créé par construire_solution_initiale
+        identifiants: Liste des identifiants des points
+        x: Dictionnaire des variables d'arêtes x[(i, j)] avec i < j
+        y: Dictionnaire des variables de stations y[i]
+        w: Dictionnaire des variables de distance d'affectation w[i]
+        distances: Matrice des distances
+    """
+    stations = set(solution['stations'])
+    cycle = solution['cycle']
+    arêtes_cycle = {(min(i, j), max(i, j)) for i, j in zip(cycle, cycle[1:])}
+    
+    for i in identifiants:
+        y[i].setInitialValue(1 if i in stations else 0)
+        w[i].setInitialValue(distances[(i, solution['affectations'][i])])
+    
+    for arete, variable in x.items():
+        variable.setInitialValue(1 if arete in arêtes_cycle else 0)
+
+
+def ajouter_coupes_sous_tours(probleme, x, y):
+    """
+    Ajoute au problème les coupes DFJ violées par la solution courante.
+    
+    On construit le graphe des arêtes sélectionnées entre les stations et
+    on cherche ses composantes connexes. Si le cycle est formé de plusieurs
+    sous-tours, chaque composante S qui ne contient pas la station 1 doit
+    être reliée au reste du cycle : pour toute station i de S,
+        
+        somme des x[e] pour les arêtes e qui sortent de S >= 2 * y[i]
+    
+    (si i est une station, le cycle passe par i et par la station 1,
+    il traverse donc deux fois la frontière de S).
+    
+    Args:
+        probleme: Problème PuLP, qui vient d'être résolu
+        x: Dictionnaire des variables d'arêtes x[(i, j)] avec i < j
+        y: Dictionnaire des variables de stations y[i]
+    
+    Returns:
+        Nombre de coupes ajoutées (0 si le cycle est connexe)
+    """
+    stations = cles_selectionnees(y)
+    arêtes = cles_selectionnees(x)
+    
+    composantes = composantes_connexes(stations, arêtes)
+    if len(composantes) <= 1:
+        return 0
+    
+    nombre_coupes = 0
+    for composante in composantes:
+        if 1 in composante:
+            continue
+        
+        # Arêtes entre la composante et le reste des points
+        arêtes_sortantes = pulp.lpSum(
+            variable for (i, j), variable in x.items()
+            if (i in composante) != (j in composante)
+        )
+        for i in composante:
+            probleme += arêtes_sortantes >= 2 * y[i]
+            nombre_coupes += 1
+    
+    return nombre_coupes
+
+
+def cles_selectionnees(variables):
+    """
+    Retourne les clés des variables binaires qui valent 1 dans la solution.
+    
+    Les valeurs sont lues directement (attribut varValue) et comparées
+    en une seule opération numpy, au lieu d'un appel à pulp.value par variable.
+    
+    Args:
+        variables: Dictionnaire clé -> variable PuLP
+    
+    Returns:
+        Liste des clés dont la variable vaut 1 (dans l'ordre du dictionnaire)
+    """
+    cles = list(variables.keys())
+    valeurs = np.fromiter((variable.varValue or 0.0 for variable in variables.values()),
+                          dtype=np.float64, count=len(cles))
+    return [cles[k] for k in np.flatnonzero(valeurs > 0.5)]
+
+
+def composantes_connexes(stations, arêtes):
+    """
+    Calcule les composantes connexes du graphe des stations.
+    
+    Args:
+        stations: Liste des stations
+        arêtes: Liste de tuples (i, j) représentant les arêtes entre stations
+    
+    Returns:
+        Liste d'ensembles de stations (une composante par ensemble)
+    """
+    voisins = {s: [] for s in stations}
+    for i, j in arêtes:
+        if i in voisins and j in voisins:
+            voisins[i].append(j)
+            voisins[j].append(i)
+    
+    composantes = []
+    deja_vues = set()
+    
+    for station in stations:
+        if station in deja_vues:
+            continue
+        
+        # Parcours en profondeur à partir de la station
+        composante = {station}
+        pile = [station]
+        while pile:
+            courante = pile.pop()
+            for voisin in voisins[courante]:
+                if voisin not in composante:
+                    composante.add(voisin)
+                    pile.append(voisin)
+        
+        deja_vues |= composante
+        composantes.append(composante)
+    
+    return composantes
+
+
 def construire_cycle_depuis_aretes(stations, arêtes):
     """
     Construit un cycle ordonné à partir d'une liste d'arêtes.
@@ -197,7 +390,7 @@ def construire_cycle_depuis_aretes(stations, arêtes):
     Args:
         stations: Liste des stations
         arêtes: Liste de tuples (i, j) représentant les arêtes du cycle
-        
+    
     Returns:
         Liste ordonnée des stations dans le cycle
     """
@@ -207,35 +400,42 @@ def construire_cycle_depuis_aretes(stations, arêtes):
     if len(stations) == 1:
         return [stations[0], stations[0]]
     
-    # Création d'un graphe avec les arêtes
-    graphe = {s: [] for s in stations}
+    # Voisins de chaque station dans deux tableaux indexés par la position
+    # de la station dans la liste : dans un cycle, chaque station a
+    # exactement deux voisins (voisin_a et voisin_b, -1 si pas encore vu)
+    position = {s: k for k, s in enumerate(stations)}
+    voisin_a = [-1] * len(stations)
+    voisin_b = [-1] * len(stations)
     for i, j in arêtes:
-        if i in stations and j in stations:
-            graphe[i].append(j)
-            graphe[j].append(i)
+        k_i = position.get(i)
+        k_j = position.get(j)
+        if k_i is None or k_j is None:
+            continue
+        if voisin_a[k_i] < 0:
+            voisin_a[k_i] = k_j
+        else:
+            voisin_b[k_i] = k_j
+        if voisin_a[k_j] < 0:
+            voisin_a[k_j] = k_i
+        else:
+            voisin_b[k_j] = k_i
     
     # Construction du cycle en partant de la station 1
-    if 1 not in stations:
-        station_depart = stations[0]
-    else:
-        station_depart = 1
-    
-    cycle = [station_depart]
-    station_courante = station_depart
-    station_precedente = None
-    
-    # Parcours du cycle
-    while len(cycle) < len(stations):
-        voisins = graphe[station_courante]
-        # On choisit le voisin qui n'est pas le précédent
-        for voisin in voisins:
-            if voisin != station_precedente:
-                cycle.append(voisin)
-                station_precedente = station_courante
-                station_courante = voisin
-                break
+    depart = position.get(1, 0)
+    
+    ordre = [depart]
+    courante = depart
+    precedente = -1
+    
+    # Parcours du cycle : on avance vers le voisin qui n'est pas le précédent
+    for _ in range(len(stations) - 1):
+        suivante = voisin_a[courante] if voisin_a[courante] != precedente else voisin_b[courante]
+        ordre.append(suivante)
+        precedente = courante
+        courante = suivante
     
-    # Fermeture du cycle
-    cycle.append(station_depart)
+    # Retour aux identifiants et fermeture du cycle
+    cycle = [stations[k] for k in ordre]
+    cycle.append(stations[depart])
     
     return cycle
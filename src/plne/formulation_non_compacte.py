@@ -1,22 +1,32 @@
 # Formulation PLNE non compacte pour le problème anneau-étoile
 # Utilise des contraintes de séparation pour les sous-tours
 
+import time
+from itertools import combinations, permutations
+
 import pulp
 from src.calcul_distances import creer_matrice_distances
+from src.heuristiques.solution_initiale import construire_solution_initiale
+from src.plne.formulation_compacte import (ajouter_coupes_sous_tours, cles_selectionnees,
+                                          construire_cycle_depuis_aretes, creer_solveur)
 
 
-def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
+def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300, distances=None):
     """
     Résout le problème anneau-étoile avec une formulation PLNE non compacte.
     
     Cette formulation utilise des contraintes de séparation pour éliminer
-    les sous-tours. Les contraintes sont ajoutées dynamiquement lors de
-    la résolution (séparation entière et heuristique).
+    les sous-tours. Les contraintes sont ajoutées dynamiquement : après
+    chaque résolution, les sous-tours de la solution entière sont détectés
+    (composantes connexes) et les coupes correspondantes sont ajoutées
+    avant de résoudre à nouveau (séparation entière exacte).
     
     Variables :
     - y[i] : variable binaire, vaut 1 si le point i est une station
     - x[i,j] : variable binaire, vaut 1 si l'arête (i,j) est dans le cycle
     - z[i,j] : variable binaire, vaut 1 si le point i est affecté à la station j
+      (pour i != j : une station est affectée à elle-même, z[i,i] vaut
+      donc y[i] et n'est pas une variable du modèle)
     
     Contraintes :
     1. Cardinalité : exactement p stations
@@ -24,7 +34,7 @@ def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
     3. Degré : chaque station a exactement 2 arêtes
     4. Affectation : chaque point est affecté à exactement une station
     5. Logiques : z[i,j] <= y[j]
-    6. Inégalités (9) : y[j] >= x[i,j] pour i != 1
+    6. Inégalités (9) : x[i,j] <= y[i] et x[i,j] <= y[j]
     7. Séparation des sous-tours (ajoutées dynamiquement)
     
     Avantages :
@@ -38,7 +48,9 @@ def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
     
     Limites :
     - Implémentation simplifiée pour un niveau étudiant
-    - Séparation heuristique seulement (pas exacte)
+    - Séparation sur les solutions entières seulement : CBC (via PuLP) ne
+      permet pas d'ajouter des coupes pendant l'arbre de recherche, on
+      relance donc la résolution après chaque ajout de coupes
     - Temps de résolution peut être long
     
     Args:
@@ -46,12 +58,15 @@ def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
         p: Nombre de stations à sélectionner
         alpha: Coefficient de pondération (0 <= alpha <= 1)
         timeout: Temps maximum de résolution en secondes
-        
+        distances: Matrice des distances déjà calculée (optionnel).
+                   Si None, elle est créée avec creer_matrice_distances
+    
     Returns:
         Dictionnaire contenant la solution optimale ou None si non résolu
     """
-    # Création de la matrice des distances
-    distances = creer_matrice_distances(points)
+    # Création de la matrice des distances (si elle n'est pas fournie)
+    if distances is None:
+        distances = creer_matrice_distances(points)
     
     # Extraction des identifiants
     identifiants = [point[0] for point in points]
@@ -69,24 +84,32 @@ def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
     # y[i] : 1 si le point i est une station
     y = pulp.LpVariable.dicts("y", identifiants, cat='Binary')
     
+    # Arêtes (i, j) avec i < j, et couples (point, station) pour les affectations.
+    # Il n'y a pas de couple (i, i) : si i est une station, son affectation à
+    # elle-même ne coûte rien, on peut donc toujours la choisir et remplacer
+    # z[i,i] par y[i] (n variables et n contraintes z[i,i] <= y[i] en moins)
+    paires = list(combinations(sorted(identifiants), 2))
+    couples = list(permutations(identifiants, 2))
+    
     # x[i,j] : 1 si l'arête (i,j) est dans le cycle (i < j)
-    x = {}
-    for i in identifiants:
-        for j in identifiants:
-            if i < j:
-                x[(i, j)] = pulp.LpVariable(f"x_{i}_{j}", cat='Binary')
+    x = pulp.LpVariable.dicts("x", paires, cat='Binary')
     
     # z[i,j] : 1 si le point i est affecté à la station j
-    z = {}
-    for i in identifiants:
-        for j in identifiants:
-            z[(i, j)] = pulp.LpVariable(f"z_{i}_{j}", cat='Binary')
+    z = pulp.LpVariable.dicts("z", couples, cat='Binary')
     
     # Fonction objectif
-    cout_cycle = pulp.lpSum([distances[(i, j)] * x[(i, j)] 
-                            for i in identifiants for j in identifiants if i < j])
-    cout_affectation = pulp.lpSum([distances[(i, j)] * z[(i, j)] 
-                                  for i in identifiants for j in identifiants])
+    # Les distances sont lues dans les lignes de la matrice (listes Python,
+    # indexées par la position des points) plutôt que par distances[(i, j)],
+    # qui passe par le dictionnaire id -> ligne à chaque coefficient
+    lignes = distances.lignes
+    indices = distances.indices
+    ligne_de = {i: lignes[indices[i]] for i in identifiants}
+    colonne_de = {j: indices[j] for j in identifiants}
+    
+    # Expressions créées directement à partir des dictionnaires
+    # variable -> coefficient, sans former chaque terme d * x séparément
+    cout_cycle = pulp.LpAffineExpression({x[(i, j)]: ligne_de[i][colonne_de[j]] for i, j in paires})
+    cout_affectation = pulp.LpAffineExpression({z[(i, j)]: ligne_de[i][colonne_de[j]] for i, j in couples})
     
     probleme += alpha * cout_cycle + (1 - alpha) * cout_affectation
     
@@ -99,81 +122,93 @@ def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
     probleme += y[1] == 1
     
     # 3. Contraintes de degré : chaque station a exactement 2 arêtes
-    for i in identifiants:
-        arêtes_incidentes = []
-        for j in identifiants:
-            if i < j:
-                arêtes_incidentes.append(x[(i, j)])
-            elif j < i:
-                arêtes_incidentes.append(x[(j, i)])
-        probleme += pulp.lpSum(arêtes_incidentes) == 2 * y[i]
-    
-    # 4. Contraintes d'affectation : chaque point est affecté à exactement une station
-    for i in identifiants:
-        probleme += pulp.lpSum([z[(i, j)] for j in identifiants]) == 1
+    # (arêtes incidentes à chaque point regroupées en un seul parcours des paires)
+    arêtes_incidentes = {i: [] for i in identifiants}
+    for i, j in paires:
+        arêtes_incidentes[i].append(x[(i, j)])
+        arêtes_incidentes[j].append(x[(i, j)])
     
-    # 5. Contraintes logiques : z[i,j] <= y[j]
     for i in identifiants:
-        for j in identifiants:
-            probleme += z[(i, j)] <= y[j]
+        probleme += pulp.lpSum(arêtes_incidentes[i]) == 2 * y[i]
     
-    # 6. Inégalités (9) : y[j] >= x[i,j] pour i != 1
-    # Ces inégalités renforcent la formulation
-    for i in identifiants:
-        if i != 1:
-            for j in identifiants:
-                if i < j:
-                    probleme += y[j] >= x[(i, j)]
-                elif j < i:
-                    probleme += y[j] >= x[(j, i)]
-    
-    # 7. Contraintes de sous-tour élimination (séparation heuristique)
-    # On ajoute les contraintes pour les ensembles S de taille 2 d'abord
-    # (séparation entière simplifiée)
+    # 4. Contraintes d'affectation : chaque point est affecté à exactement une
+    # station, lui-même s'il est une station (y[i] tient lieu de z[i,i])
     for i in identifiants:
-        if i != 1:
-            for j in identifiants:
-                if i < j and j != 1:
-                    # Contrainte pour S = {i, j}
-                    # Si i et j sont des stations, au moins une arête sort de {i,j}
-                    # Simplification : on force qu'il y ait au moins une connexion
-                    # avec l'extérieur si les deux sont stations
-                    probleme += x[(i, j)] <= y[i]
-                    probleme += x[(i, j)] <= y[j]
-    
-    # Résolution avec callback de séparation (simplifié)
-    # Dans une implémentation complète, on utiliserait un callback
-    # pour ajouter dynamiquement les contraintes violées
-    # Ici, on résout directement avec les contraintes de base
+        probleme += pulp.lpSum([z[(i, j)] for j in identifiants if j != i]) + y[i] == 1
+    
+    # 5. Contraintes logiques : z[i,j] <= y[j] (i != j)
+    for i, j in couples:
+        probleme += z[(i, j)] <= y[j]
+    
+    # 6. Inégalités (9) : une arête ne peut relier que deux stations,
+    # x[i,j] <= y[i] et x[i,j] <= y[j]
+    # Une seule contrainte par (arête, extrémité).
+    # Pour la station 1, x[1,j] <= y[1] est toujours vérifiée (y[1] = 1) et
+    # n'est pas ajoutée ; x[1,j] <= y[j] l'est en revanche (elle découle
+    # déjà de la contrainte de degré de j, mais la renforce en relaxation)
+    for i, j in paires:
+        for extremite in (i, j):
+            if extremite != 1:
+                probleme += x[(i, j)] <= y[extremite]
+    
+    # 7. Séparation des sous-tours (Dantzig-Fulkerson-Johnson)
+    # On résout, on cherche les sous-tours dans la solution entière obtenue,
+    # on ajoute les coupes correspondantes et on résout à nouveau, jusqu'à
+    # obtenir un cycle unique (mêmes coupes que la formulation compacte,
+    # voir ajouter_coupes_sous_tours)
+    
+    # Solution de départ : l'heuristique grille + plus proche voisin + 2-opt
+    # donne rapidement une solution réalisable (un seul cycle). Fournie au
+    # solveur, elle sert de borne supérieure dès le début de la recherche
+    solution_depart = construire_solution_initiale(points, p, methode_selection='grille',
+                                                   ameliorer_cycle=True, alpha=alpha,
+                                                   distances=distances)
     
     try:
-        solveur = pulp.PULP_CBC_CMD(timeLimit=timeout, msg=1)
-        probleme.solve(solveur)
+        debut = time.time()
         
-        statut = pulp.LpStatus[probleme.status]
+        while True:
+            # La résolution précédente a remplacé les valeurs des variables :
+            # on redonne la solution de départ, qui respecte toutes les coupes
+            fixer_valeurs_initiales(solution_depart, x, y, z)
+            
+            # Temps restant sur le temps total autorisé
+            temps_restant = max(1, timeout - (time.time() - debut))
+            probleme.solve(creer_solveur(temps_restant))
+            
+            statut = pulp.LpStatus[probleme.status]
+            if statut != 'Optimal':
+                break
+            
+            # Sous-tours de la solution entière : si aucune coupe n'est
+            # ajoutée, le cycle est connexe et la solution est optimale
+            if not ajouter_coupes_sous_tours(probleme, x, y):
+                break
+            
+            if time.time() - debut >= timeout:
+                statut = 'Not Solved'
+                break
         
         if statut == 'Optimal':
             # Extraction de la solution
-            stations = [i for i in identifiants if pulp.value(y[i]) > 0.5]
+            # (valeurs lues en un seul passage par variable, voir cles_selectionnees)
+            stations = cles_selectionnees(y)
             
             # Extraction du cycle
-            arêtes_cycle = [(i, j) for i in identifiants for j in identifiants 
-                          if i < j and pulp.value(x[(i, j)]) > 0.5]
+            arêtes_cycle = cles_selectionnees(x)
             
             # Construction du cycle ordonné
             cycle = construire_cycle_depuis_aretes(stations, arêtes_cycle)
             
-            # Extraction des affectations
-            affectations = {}
-            for i in identifiants:
-                for j in identifiants:
-                    if pulp.value(z[(i, j)]) > 0.5:
-                        affectations[i] = j
-                        break
+            # Extraction des affectations : un seul couple (i, j) sélectionné
+            # par point i qui n'est pas une station (contrainte 4), les
+            # stations étant affectées à elles-mêmes
+            affectations_points = dict(cles_selectionnees(z))
+            affectations = {i: affectations_points.get(i, i) for i in identifiants}
             
             # Calcul des coûts
-            longueur_cycle = sum([distances[(i, j)] for i, j in arêtes_cycle])
-            cout_affectation = sum([distances[(i, affectations[i])] for i in identifiants])
+            longueur_cycle = sum([ligne_de[i][colonne_de[j]] for i, j in arêtes_cycle])
+            cout_affectation = sum([ligne_de[i][colonne_de[affectations[i]]] for i in identifiants])
             cout_total = alpha * longueur_cycle + (1 - alpha) * cout_affectation
             
             solution = {
@@ -191,58 +226,35 @@ def resoudre_plne_non_compacte(points, p, alpha=0.5, timeout=300):
         else:
             print(f"Statut de résolution : {statut}")
             return None
-            
+    
     except Exception as e:
         print(f"Erreur lors de la résolution : {e}")
         return None
 
 
-def construire_cycle_depuis_aretes(stations, arêtes):
+def fixer_valeurs_initiales(solution, x, y, z):
     """
-    Construit un cycle ordonné à partir d'une liste d'arêtes.
+    Donne aux variables du modèle les valeurs d'une solution heuristique.
+    
+    Ces valeurs sont transmises à CBC comme solution de départ
+    (option warmStart du solveur).
     
     Args:
-        stations: Liste des stations
-        arêtes: Liste de tuples (i, j) représentant les arêtes du cycle
-        
-    Returns:
-        Liste ordonnée des stations dans le cycle
+        solution: Dictionnaire de solution créé par construire_solution_initiale
+        x: Dictionnaire des variables d'arêtes x[(i, j)] avec i < j
+        y: Dictionnaire des variables de stations y[i]
+        z: Dictionnaire des variables d'affectation z[(i, j)] avec i != j
     """
-    if len(stations) == 0:
-        return []
-    
-    if len(stations) == 1:
-        return [stations[0], stations[0]]
-    
-    # Création d'un graphe avec les arêtes
-    graphe = {s: [] for s in stations}
-    for i, j in arêtes:
-        if i in stations and j in stations:
-            graphe[i].append(j)
-            graphe[j].append(i)
-    
-    # Construction du cycle en partant de la station 1
-    if 1 not in stations:
-        station_depart = stations[0]
-    else:
-        station_depart = 1
-    
-    cycle = [station_depart]
-    station_courante = station_depart
-    station_precedente = None
-    
-    # Parcours du cycle
-    while len(cycle) < len(stations):
-        voisins = graphe[station_courante]
-        # On choisit le voisin qui n'est pas le précédent
-        for voisin in voisins:
-            if voisin != station_precedente:
-                cycle.append(voisin)
-                station_precedente = station_courante
-                station_courante = voisin
-                break
+    stations = set(solution['stations'])
+    cycle = solution['cycle']
+    arêtes_cycle = {(min(i, j), max(i, j)) for i, j in zip(cycle, cycle[1:])}
+    affectations = solution['affectations']
+    
+    for i, variable in y.items():
+        variable.setInitialValue(1 if i in stations else 0)
     
-    # Fermeture du cycle
-    cycle.append(station_depart)
+    for arete, variable in x.items():
+        variable.setInitialValue(1 if arete in arêtes_cycle else 0)
     
-    return cycle
+    for (i, j), variable in z.items():
+        variable.setInitialValue(1 if affectations[i] == j else 0)
@@ -0,0 +1,62 @@
+# Insertion au moindre coût pour le TSP
+# Modifie localement un cycle existant quand une station est remplacée
+
+from src.calcul_distances import obtenir_distance
+
+
+def remplacer_station_cycle(cycle, station_retiree, station_ajoutee, distances):
+    """
+    Remplace une station du cycle par une autre sans reconstruire le cycle.
+    
+    La station retirée est supprimée du cycle (ses deux voisins sont
+    reliés directement), puis la station ajoutée est insérée entre les
+    deux stations consécutives où elle allonge le moins le cycle
+    (insertion au moindre coût).
+    
+    Un échange de station ne modifie que quelques arêtes du cycle : le
+    reste de l'ordre de visite est conservé, ce qui est beaucoup moins
+    coûteux que de relancer le plus proche voisin sur toutes les stations.
+    Le cycle obtenu peut ensuite être amélioré par 2-opt.
+    
+    Args:
+        cycle: Liste ordonnée des stations formant le cycle (commence et finit par la même station)
+        station_retiree: Identifiant de la station à retirer (différente de la station de départ)
+        station_ajoutee: Identifiant de la station à insérer
+        distances: Matrice des distances créée par creer_matrice_distances
+    
+    Returns:
+        Nouveau cycle (commence et finit par la même station)
+    """
+    # Cycle sans la fermeture et sans la station retirée
+    stations_cycle = [s for s in cycle[:-1] if s != station_retiree]
+    
+    if len(stations_cycle) == 0:
+        return [station_ajoutee, station_ajoutee]
+    
+    if len(stations_cycle) == 1:
+        return [stations_cycle[0], station_ajoutee, stations_cycle[0]]
+    
+    # Recherche de la position d'insertion la moins coûteuse
+    # Insérer entre a et b remplace l'arête (a, b) par (a, s) et (s, b)
+    meilleure_position = 0
+    meilleur_surcout = float('inf')
+    
+    for k in range(len(stations_cycle)):
+        station_a = stations_cycle[k]
+        station_b = stations_cycle[(k + 1) % len(stations_cycle)]
+        
+        surcout = (
+            obtenir_distance(distances, station_a, station_ajoutee) +
+            obtenir_distance(distances, station_ajoutee, station_b) -
+            obtenir_distance(distances, station_a, station_b)
+        )
+        
+        if surcout < meilleur_surcout:
+            meilleur_surcout = surcout
+            meilleure_position = k
+    
+    # Insertion après la position trouvée, puis fermeture du cycle
+    stations_cycle.insert(meilleure_position + 1, station_ajoutee)
+    stations_cycle.append(stations_cycle[0])
+    
+    return stations_cycle
@@ -25,7 +25,7 @@ def construire_cycle_plus_proche_voisin(stations, distances):
     
     Args:
         stations: Liste des identifiants des stations à visiter
-        distances: Dictionnaire des distances créé par creer_matrice_distances
+        distances: Matrice des distances créée par creer_matrice_distances
         
     Returns:
         Liste ordonnée des stations formant le cycle (commence et finit à la station 1)
@@ -79,7 +79,7 @@ def calculer_longueur_cycle(cycle, distances):
     
     Args:
         cycle: Liste ordonnée des stations formant le cycle
-        distances: Dictionnaire des distances créé par creer_matrice_distances
+        distances: Matrice des distances créée par creer_matrice_distances
         
     Returns:
         Longueur totale du cycle
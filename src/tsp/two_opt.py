@@ -1,76 +1,191 @@
 # Algorithme 2-opt pour améliorer un cycle TSP
 # Recherche locale qui améliore un cycle en testant des échanges d'arêtes
 
-from src.calcul_distances import obtenir_distance
+from collections import deque
 
+import numpy as np
+from src.acceleration import get_num_threads, njit, prange, NUMBA_DISPONIBLE
 
-def appliquer_2opt(cycle, i, j):
+
+@njit(cache=True, fastmath=True)
+def ameliorer_cycle_2opt_nb(cycle_idx, D):
     """
-    Applique un échange 2-opt au cycle.
+    Version compilée (Numba) de la boucle 2-opt.
     
-    L'échange 2-opt consiste à :
-    - Prendre deux arêtes (i, i+1) et (j, j+1) dans le cycle
-    - Les remplacer par (i, j) et (i+1, j+1)
-    - Cela inverse la section du cycle entre i+1 et j
+    Travaille uniquement sur des tableaux numpy : le cycle est donné par
+    les indices de lignes de la matrice D (premier indice répété à la fin).
+    Même stratégie que ameliorer_cycle_2opt : à chaque passe, on applique
+    le meilleur échange trouvé, jusqu'à ce qu'aucun échange n'améliore le cycle.
     
     Args:
-        cycle: Liste ordonnée des stations formant le cycle
-        i: Indice de la première arête (0 <= i < j)
-        j: Indice de la deuxième arête (i < j < len(cycle)-1)
-        
+        cycle_idx: Tableau int64 des indices des stations du cycle (fermé)
+        D: Tableau float64 (n, n) des distances
+    
     Returns:
-        Nouveau cycle après l'échange 2-opt
+        Nouveau tableau d'indices du cycle amélioré
     """
-    # Création d'une copie du cycle
-    nouveau_cycle = cycle.copy()
+    cycle = cycle_idx.copy()
+    nombre_stations = cycle.shape[0] - 1
     
-    # Inversion de la section entre i+1 et j
-    # On inverse la sous-liste de i+1 à j (inclus)
-    section_a_inverser = nouveau_cycle[i+1:j+1]
-    section_a_inverser.reverse()
-    nouveau_cycle[i+1:j+1] = section_a_inverser
+    while True:
+        meilleur_gain = 0.0
+        meilleur_i = -1
+        meilleur_j = -1
+        
+        for i in range(nombre_stations - 1):
+            a = cycle[i]
+            b = cycle[i + 1]
+            distance_ab = D[a, b]
+            for j in range(i + 2, nombre_stations):
+                c = cycle[j]
+                d = cycle[j + 1]
+                gain = (distance_ab + D[c, d]) - (D[a, c] + D[b, d])
+                if gain > meilleur_gain:
+                    meilleur_gain = gain
+                    meilleur_i = i
+                    meilleur_j = j
+        
+        if meilleur_gain <= 0.0001:
+            break
+        
+        # Inversion de la section entre i+1 et j (en place)
+        gauche = meilleur_i + 1
+        droite = meilleur_j
+        while gauche < droite:
+            temporaire = cycle[gauche]
+            cycle[gauche] = cycle[droite]
+            cycle[droite] = temporaire
+            gauche += 1
+            droite -= 1
     
-    return nouveau_cycle
+    return cycle
 
 
-def calculer_gain_2opt(cycle, i, j, distances):
+@njit(cache=True, fastmath=True, parallel=True)
+def ameliorer_cycle_2opt_parallele_nb(cycle_idx, D):
     """
-    Calcule le gain (réduction de distance) d'un échange 2-opt.
+    Version compilée (Numba) et parallèle de la boucle 2-opt.
     
-    Le gain est positif si l'échange améliore le cycle (réduit la distance).
-    Le gain est négatif si l'échange détériore le cycle.
+    Les échanges d'une passe sont indépendants : la boucle sur la première
+    arête i est répartie entre les fils d'exécution (prange). Chaque i
+    retient son meilleur j dans deux tableaux, puis le meilleur échange
+    est choisi en parcourant ces tableaux dans l'ordre des i. En cas
+    d'égalité, c'est donc le même échange que dans ameliorer_cycle_2opt_nb
+    (le premier dans l'ordre (i, j)) : les deux versions donnent le même cycle.
     
     Args:
-        cycle: Liste ordonnée des stations formant le cycle
-        i: Indice de la première arête
-        j: Indice de la deuxième arête
-        distances: Dictionnaire des distances
-        
+        cycle_idx: Tableau int64 des indices des stations du cycle (fermé)
+        D: Tableau float64 (n, n) des distances
+    
     Returns:
-        Gain de l'échange (positif = amélioration)
+        Nouveau tableau d'indices du cycle amélioré
+    """
+    cycle = cycle_idx.copy()
+    nombre_stations = cycle.shape[0] - 1
+    
+    # Meilleur gain et meilleur j pour chaque première arête i
+    gains = np.zeros(nombre_stations, dtype=np.float64)
+    meilleurs_j = np.full(nombre_stations, -1, dtype=np.int64)
+    
+    while True:
+        for i in prange(nombre_stations - 1):
+            a = cycle[i]
+            b = cycle[i + 1]
+            distance_ab = D[a, b]
+            gain_i = 0.0
+            j_i = -1
+            for j in range(i + 2, nombre_stations):
+                c = cycle[j]
+                d = cycle[j + 1]
+                gain = (distance_ab + D[c, d]) - (D[a, c] + D[b, d])
+                if gain > gain_i:
+                    gain_i = gain
+                    j_i = j
+            gains[i] = gain_i
+            meilleurs_j[i] = j_i
+        
+        # Réduction : meilleur échange sur toutes les premières arêtes
+        meilleur_gain = 0.0
+        meilleur_i = -1
+        for i in range(nombre_stations - 1):
+            if gains[i] > meilleur_gain:
+                meilleur_gain = gains[i]
+                meilleur_i = i
+        
+        if meilleur_gain <= 0.0001:
+            break
+        
+        # Inversion de la section entre i+1 et j (en place)
+        gauche = meilleur_i + 1
+        droite = meilleurs_j[meilleur_i]
+        while gauche < droite:
+            temporaire = cycle[gauche]
+            cycle[gauche] = cycle[droite]
+            cycle[droite] = temporaire
+            gauche += 1
+            droite -= 1
+    
+    return cycle
+
+
+# Nombre de stations à partir duquel, avec plusieurs fils d'exécution Numba,
+# ameliorer_cycle_2opt utilise la version parallèle : en dessous, une passe
+# coûte moins que le lancement des fils
+TAILLE_MIN_2OPT_PARALLELE = 150
+
+# Nombre de stations à partir duquel ameliorer_cycle_2opt utilise les listes
+# de voisins (première amélioration) au lieu de la meilleure amélioration :
+# la meilleure amélioration coûte O(p²) par échange, soit O(p³) au total
+TAILLE_MIN_2OPT_VOISINS = 300
+
+# Nombre de stations à partir duquel, sans Numba, le 2-opt vectorisé (numpy)
+# est plus rapide que la boucle Python
+TAILLE_MIN_2OPT_NUMPY = 20
+
+
+def _ameliorer_cycle_2opt_numpy(cycle_idx, D):
     """
-    # Stations concernées par les arêtes actuelles
-    station_i = cycle[i]
-    station_i_suivante = cycle[i + 1]
-    station_j = cycle[j]
-    station_j_suivante = cycle[j + 1]
+    Version vectorisée (numpy) de la boucle 2-opt, utilisée sans Numba.
     
-    # Distance actuelle des deux arêtes
-    distance_actuelle = (
-        obtenir_distance(distances, station_i, station_i_suivante) +
-        obtenir_distance(distances, station_j, station_j_suivante)
-    )
+    À chaque passe, les gains de tous les échanges (i, j) sont calculés
+    d'un coup par broadcasting dans une matrice (m, m), où m est le nombre
+    de stations : gain[i, j] = d(a_i, b_i) + d(a_j, b_j) - d(a_i, a_j) - d(b_i, b_j),
+    avec (a_k, b_k) la k-ième arête du cycle. Seuls les couples j >= i + 2
+    sont gardés. Même stratégie que ameliorer_cycle_2opt : le meilleur
+    échange est appliqué (le premier en cas d'égalité, comme la boucle),
+    jusqu'à ce qu'aucun échange n'améliore le cycle.
+    
+    Args:
+        cycle_idx: Tableau des indices des stations du cycle (fermé)
+        D: Tableau float64 (n, n) des distances
+    
+    Returns:
+        Nouveau tableau d'indices du cycle amélioré
+    """
+    cycle = cycle_idx.copy()
+    nombre_stations = cycle.shape[0] - 1
     
-    # Distance après l'échange 2-opt
-    distance_nouvelle = (
-        obtenir_distance(distances, station_i, station_j) +
-        obtenir_distance(distances, station_i_suivante, station_j_suivante)
-    )
+    # Couples (i, j) qui ne correspondent pas à un échange (j < i + 2)
+    hors_voisinage = ~np.triu(np.ones((nombre_stations, nombre_stations), dtype=bool), k=2)
     
-    # Le gain est la différence (positif = amélioration)
-    gain = distance_actuelle - distance_nouvelle
+    while True:
+        debuts = cycle[:-1]
+        fins = cycle[1:]
+        longueurs_aretes = D[debuts, fins]
+        
+        gains = ((longueurs_aretes[:, np.newaxis] + longueurs_aretes[np.newaxis, :]) -
+                 (D[np.ix_(debuts, debuts)] + D[np.ix_(fins, fins)]))
+        gains[hors_voisinage] = 0.0
+        
+        meilleur_i, meilleur_j = divmod(int(gains.argmax()), nombre_stations)
+        
+        if gains[meilleur_i, meilleur_j] <= 0.0001:
+            break
+        
+        # Inversion de la section entre i+1 et j
+        cycle[meilleur_i + 1:meilleur_j + 1] = cycle[meilleur_i + 1:meilleur_j + 1][::-1].copy()
     
-    return gain
+    return cycle
 
 
 def ameliorer_cycle_2opt(cycle, distances):
@@ -95,12 +210,13 @@ def ameliorer_cycle_2opt(cycle, distances):
     Limites :
     - Ne garantit pas l'optimalité (peut rester bloqué dans un optimum local)
     - Complexité : O(n²) par itération, plusieurs itérations possibles
-    - Peut être lent pour de grandes instances
+    - Peut être lent pour de grandes instances : à partir de
+      TAILLE_MIN_2OPT_VOISINS stations, on utilise ameliorer_cycle_2opt_voisins
     
     Args:
         cycle: Liste ordonnée des stations formant le cycle (commence et finit par la même station)
-        distances: Dictionnaire des distances créé par creer_matrice_distances
-        
+        distances: Matrice des distances créée par creer_matrice_distances
+    
     Returns:
         Cycle amélioré (le coût diminue ou reste stable)
     """
@@ -109,8 +225,37 @@ def ameliorer_cycle_2opt(cycle, distances):
         # Un cycle avec 3 stations ou moins ne peut pas être amélioré par 2-opt
         return cycle
     
-    # Copie du cycle pour ne pas modifier l'original
-    cycle_ameliore = cycle.copy()
+    # Grand cycle : seuls les échanges avec les plus proches voisines sont testés
+    if len(cycle) - 1 >= TAILLE_MIN_2OPT_VOISINS:
+        return ameliorer_cycle_2opt_voisins(cycle, distances)
+    
+    # Avec Numba, la boucle est exécutée par la version compilée
+    # (parallèle sur un grand cycle quand plusieurs fils sont disponibles)
+    if NUMBA_DISPONIBLE:
+        # (indices_de donne déjà des entiers 64 bits sur les machines 64 bits : pas de copie)
+        cycle_idx = distances.indices_de(cycle).astype(np.int64, copy=False)
+        if len(cycle) - 1 >= TAILLE_MIN_2OPT_PARALLELE and get_num_threads() > 1:
+            cycle_idx = ameliorer_cycle_2opt_parallele_nb(cycle_idx, distances.matrice)
+        else:
+            cycle_idx = ameliorer_cycle_2opt_nb(cycle_idx, distances.matrice)
+        return distances.identifiants[cycle_idx].tolist()
+    
+    # Sans Numba, sur un grand cycle, les gains de tous les échanges d'une
+    # passe sont calculés d'un coup par numpy
+    if len(cycle) - 1 >= TAILLE_MIN_2OPT_NUMPY:
+        cycle_idx = distances.indices_de(cycle)
+        cycle_idx = _ameliorer_cycle_2opt_numpy(cycle_idx, distances.matrice)
+        return distances.identifiants[cycle_idx].tolist()
+    
+    # Traduction du cycle en indices de lignes de la matrice, une seule fois :
+    # la boucle interne lit ensuite les distances directement dans les lignes.
+    # Cette liste est une copie : les échanges sont appliqués en place, sans
+    # recopier le cycle à chaque échange, et le cycle d'identifiants n'est
+    # reconstruit qu'à la fin
+    lignes = distances.lignes
+    cycle_indices = [distances.indices[s] for s in cycle]
+    identifiant_de = dict(zip(cycle_indices, cycle))
+    
     amelioration_trouvee = True
     
     # On continue tant qu'on trouve des améliorations
@@ -122,12 +267,21 @@ def ameliorer_cycle_2opt(cycle, distances):
         
         # Test de tous les échanges 2-opt possibles
         # On ignore la dernière station car c'est la même que la première (fermeture du cycle)
-        nombre_stations = len(cycle_ameliore) - 1
+        nombre_stations = len(cycle_indices) - 1
         
         for i in range(nombre_stations - 1):
+            a = cycle_indices[i]
+            b = cycle_indices[i + 1]
+            ligne_a = lignes[a]
+            ligne_b = lignes[b]
+            distance_ab = ligne_a[b]
+            
             for j in range(i + 2, nombre_stations):
-                # Calcul du gain de l'échange
-                gain = calculer_gain_2opt(cycle_ameliore, i, j, distances)
+                c = cycle_indices[j]
+                d = cycle_indices[j + 1]
+                
+                # Gain de l'échange : arêtes (a, b) et (c, d) remplacées par (a, c) et (b, d)
+                gain = (distance_ab + lignes[c][d]) - (ligne_a[c] + ligne_b[d])
                 
                 # Si le gain est positif, on retient cet échange
                 if gain > meilleur_gain:
@@ -137,7 +291,285 @@ def ameliorer_cycle_2opt(cycle, distances):
         
         # Si on a trouvé une amélioration, on l'applique
         if meilleur_gain > 0.0001:  # Petite tolérance pour les erreurs numériques
-            cycle_ameliore = appliquer_2opt(cycle_ameliore, meilleur_i, meilleur_j)
+            # Inversion en place de la section entre i+1 et j
+            cycle_indices[meilleur_i + 1:meilleur_j + 1] = cycle_indices[meilleur_j:meilleur_i:-1]
             amelioration_trouvee = True
     
-    return cycle_ameliore
+    return [identifiant_de[k] for k in cycle_indices]
+
+
+# Nombre de stations à partir duquel le 2-opt local (en Python) est plus
+# rapide que le 2-opt complet après un échange de station
+TAILLE_MIN_2OPT_LOCAL = 16
+
+
+def ameliorer_cycle_2opt_local(cycle, distances, stations_a_examiner):
+    """
+    Améliore un cycle par 2-opt en n'examinant que les stations touchées
+    par une modification récente (technique des "don't look bits").
+    
+    Après un échange de station dans le recuit simulé, le cycle courant
+    était déjà un optimum local du 2-opt : seules les arêtes autour des
+    stations modifiées peuvent permettre une amélioration. Au lieu de
+    retester toutes les paires d'arêtes, on garde une file des stations
+    à examiner (celles dont le bit "ne pas regarder" est à zéro) :
+    - pour une station a, on teste ses deux arêtes (vers la suivante et
+      vers la précédente) contre toutes les autres arêtes du cycle
+    - si un échange améliore le cycle, on l'applique (première amélioration)
+      et les quatre extrémités des arêtes modifiées sont remises dans la file
+    - sinon la station sort de la file (son bit passe à un)
+    
+    Le coût est de l'ordre de O(p) par station examinée, au lieu de
+    O(p²) par passe pour ameliorer_cycle_2opt.
+    
+    Pour les petits cycles, ou si Numba est disponible, le 2-opt complet
+    (ameliorer_cycle_2opt) reste moins coûteux que cette version écrite
+    en Python : il est alors utilisé à la place.
+    
+    Args:
+        cycle: Liste ordonnée des stations formant le cycle (commence et finit par la même station)
+        distances: Matrice des distances créée par creer_matrice_distances
+        stations_a_examiner: Identifiants des stations dont le bit est remis à zéro
+    
+    Returns:
+        Cycle amélioré, commençant et finissant par la même station que cycle
+    """
+    nombre_stations = len(cycle) - 1
+    if nombre_stations <= 3:
+        # Un cycle avec 3 stations ou moins ne peut pas être amélioré par 2-opt
+        return cycle
+    
+    if NUMBA_DISPONIBLE or nombre_stations < TAILLE_MIN_2OPT_LOCAL:
+        return ameliorer_cycle_2opt(cycle, distances)
+    
+    # Ordre de visite (sans la fermeture) en indices de lignes de la matrice,
+    # et position de chaque station dans cet ordre
+    lignes = distances.lignes
+    indices = distances.indices
+    ordre = [indices[s] for s in cycle[:-1]]
+    position = {station: k for k, station in enumerate(ordre)}
+    identifiant_de = dict(zip(ordre, cycle))
+    
+    # File des stations à examiner (bit "ne pas regarder" à zéro)
+    file_examen = deque()
+    for station in stations_a_examiner:
+        station = indices[station]
+        if station in position and station not in file_examen:
+            file_examen.append(station)
+    
+    while file_examen:
+        a = file_examen.popleft()
+        ligne_a = lignes[a]
+        i = position[a]
+        
+        echange = None
+        
+        # Arête vers la suivante (a, b) puis arête vers la précédente (b, a)
+        for sens in (1, -1):
+            b = ordre[(i + sens) % nombre_stations]
+            ligne_b = lignes[b]
+            distance_ab = ligne_a[b]
+            
+            # d est la voisine de c dans le même sens que b pour a
+            voisines = ordre[sens:] + ordre[:sens]
+            
+            for c, d in zip(ordre, voisines):
+                # Remplacement des arêtes (a, b) et (c, d) par (a, c) et (b, d)
+                # Les paires d'arêtes adjacentes donnent un gain nul ; seul
+                # le cas c == a (même arête) est à exclure explicitement
+                gain = (distance_ab + lignes[c][d]) - (ligne_a[c] + ligne_b[d])
+                if gain > 0.0001 and c != a:  # Petite tolérance pour les erreurs numériques
+                    echange = (sens, b, c, d)
+                    break
+            
+            if echange is not None:
+                break
+        
+        if echange is None:
+            # Aucune amélioration depuis a : son bit passe à un
+            continue
+        
+        # Inversion de la section entre b et c (b suit a dans le sens considéré)
+        sens, b, c, d = echange
+        if sens == 1:
+            debut, fin = position[b], position[c]
+        else:
+            debut, fin = position[c], position[b]
+        _inverser_section_circulaire(ordre, position, debut, fin)
+        
+        # Les extrémités des arêtes modifiées sont à réexaminer
+        for station in (a, b, c, d):
+            if station not in file_examen:
+                file_examen.append(station)
+    
+    # Le cycle repart de la même station qu'avant
+    depart = position[indices[cycle[0]]]
+    ordre = ordre[depart:] + ordre[:depart]
+    ordre.append(ordre[0])
+    return [identifiant_de[k] for k in ordre]
+
+
+# Nombre de plus proches voisins examinés pour chaque station
+NOMBRE_VOISINS_2OPT = 10
+
+
+def ameliorer_cycle_2opt_voisins(cycle, distances, nombre_voisins=NOMBRE_VOISINS_2OPT):
+    """
+    Améliore un cycle par 2-opt en ne testant, pour chaque station, que
+    ses plus proches voisines (listes de voisins et "don't look bits").
+    
+    Un échange 2-opt qui remplace les arêtes (a, b) et (c, d) par (a, c)
+    et (b, d) ne peut améliorer le cycle que si la nouvelle arête (a, c)
+    est plus courte que (a, b), vue depuis a ou depuis une autre
+    extrémité. Pour chaque station a, on ne teste donc que les stations c
+    parmi ses nombre_voisins plus proches, dans l'ordre des distances
+    croissantes, tant que d(a, c) < d(a, b). Le premier échange qui
+    améliore le cycle est appliqué (première amélioration) et ses quatre
+    extrémités sont remises dans la file des stations à examiner, comme
+    dans ameliorer_cycle_2opt_local. Au départ, toutes les stations sont
+    dans la file.
+    
+    On teste environ p * nombre_voisins échanges par passe au lieu de p²/2.
+    L'optimum local obtenu peut différer de celui de ameliorer_cycle_2opt
+    (meilleure amélioration, tous les échanges), pour une qualité proche.
+    
+    Args:
+        cycle: Liste ordonnée des stations formant le cycle (commence et finit par la même station)
+        distances: Matrice des distances créée par creer_matrice_distances
+        nombre_voisins: Nombre de plus proches voisines testées pour chaque station
+    
+    Returns:
+        Cycle amélioré, commençant et finissant par la même station que cycle
+    """
+    nombre_stations = len(cycle) - 1
+    if nombre_stations <= 3:
+        # Un cycle avec 3 stations ou moins ne peut pas être amélioré par 2-opt
+        return cycle
+    
+    # Ordre de visite (sans la fermeture) en indices de lignes de la matrice,
+    # et position de chaque station dans cet ordre
+    lignes = distances.lignes
+    ordre = distances.indices_de(cycle[:-1]).tolist()
+    position = {station: k for k, station in enumerate(ordre)}
+    identifiant_de = dict(zip(ordre, cycle))
+    
+    # Listes des plus proches voisines de chaque station parmi les stations
+    # du cycle, triées par distance croissante
+    voisins = _plus_proches_voisins(ordre, distances.matrice, nombre_voisins)
+    
+    # File des stations à examiner (bit "ne pas regarder" à zéro)
+    file_examen = deque(ordre)
+    dans_file = set(ordre)
+    
+    while file_examen:
+        a = file_examen.popleft()
+        dans_file.discard(a)
+        ligne_a = lignes[a]
+        i = position[a]
+        
+        echange = None
+        
+        # Arête vers la suivante (a, b) puis arête vers la précédente (b, a)
+        for sens in (1, -1):
+            b = ordre[(i + sens) % nombre_stations]
+            ligne_b = lignes[b]
+            distance_ab = ligne_a[b]
+            
+            for c in voisins[a]:
+                distance_ac = ligne_a[c]
+                # Voisines plus éloignées que b : aucun gain possible depuis a
+                if distance_ac >= distance_ab:
+                    break
+                
+                # d est la voisine de c dans le même sens que b pour a
+                d = ordre[(position[c] + sens) % nombre_stations]
+                
+                # Remplacement des arêtes (a, b) et (c, d) par (a, c) et (b, d)
+                gain = (distance_ab + lignes[c][d]) - (distance_ac + ligne_b[d])
+                if gain > 0.0001:  # Petite tolérance pour les erreurs numériques
+                    echange = (sens, b, c, d)
+                    break
+            
+            if echange is not None:
+                break
+        
+        if echange is None:
+            # Aucune amélioration depuis a : son bit passe à un
+            continue
+        
+        # Inversion de la section entre b et c (b suit a dans le sens considéré)
+        sens, b, c, d = echange
+        if sens == 1:
+            debut, fin = position[b], position[c]
+        else:
+            debut, fin = position[c], position[b]
+        _inverser_section_circulaire(ordre, position, debut, fin)
+        
+        # Les extrémités des arêtes modifiées sont à réexaminer
+        for station in (a, b, c, d):
+            if station not in dans_file:
+                file_examen.append(station)
+                dans_file.add(station)
+    
+    # Le cycle repart de la même station qu'avant
+    depart = position[distances.indices[cycle[0]]]
+    ordre = ordre[depart:] + ordre[:depart]
+    ordre.append(ordre[0])
+    return [identifiant_de[k] for k in ordre]
+
+
+def _plus_proches_voisins(ordre, D, nombre_voisins):
+    """
+    Calcule, pour chaque station, ses plus proches voisines parmi les stations de ordre.
+    
+    Args:
+        ordre: Liste des indices de lignes des stations
+        D: Tableau float64 (n, n) des distances
+        nombre_voisins: Nombre de voisines à garder pour chaque station
+    
+    Returns:
+        Dictionnaire indice de station -> liste des indices de ses voisines,
+        de la plus proche à la plus éloignée
+    """
+    stations = np.asarray(ordre, dtype=np.intp)
+    sous_matrice = D[np.ix_(stations, stations)]
+    
+    # Une station n'est pas sa propre voisine
+    np.fill_diagonal(sous_matrice, np.inf)
+    
+    # Sélection des k plus proches (argpartition), puis tri de ces k seulement
+    k = min(nombre_voisins, len(ordre) - 1)
+    plus_proches = np.argpartition(sous_matrice, k - 1, axis=1)[:, :k]
+    distances_voisins = np.take_along_axis(sous_matrice, plus_proches, axis=1)
+    plus_proches = np.take_along_axis(plus_proches, distances_voisins.argsort(axis=1, kind='stable'), axis=1)
+    
+    return dict(zip(ordre, stations[plus_proches].tolist()))
+
+
+def _inverser_section_circulaire(ordre, position, debut, fin):
+    """
+    Inverse, en place, la section de l'ordre circulaire allant de la
+    position debut à la position fin (incluses, en passant éventuellement
+    par la fin de la liste).
+    
+    Inverser la section complémentaire donne le même cycle (parcouru dans
+    l'autre sens) : on inverse donc la plus courte des deux.
+    """
+    nombre_stations = len(ordre)
+    longueur = (fin - debut) % nombre_stations + 1
+    if 2 * longueur > nombre_stations:
+        debut, fin = (fin + 1) % nombre_stations, (debut - 1) % nombre_stations
+        longueur = nombre_stations - longueur
+    
+    for k in range(longueur // 2):
+        gauche = (debut + k) % nombre_stations
+        droite = (fin - k) % nombre_stations
+        ordre[gauche], ordre[droite] = ordre[droite], ordre[gauche]
+        position[ordre[gauche]] = gauche
+        position[ordre[droite]] = droite
+
+
+# Compilation dès l'import (appel sur un petit cycle) pour que le premier
+# appel réel ne paie pas le temps de compilation
+if NUMBA_DISPONIBLE:
+    ameliorer_cycle_2opt_nb(np.array([0, 1, 2, 3, 0], dtype=np.int64), np.zeros((4, 4)))
@@ -2,6 +2,20 @@
 # Affiche les instances et les solutions du problème anneau-étoile
 
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from src.lecture_tsp import Points, creer_points
+
+
+# Nombre maximal de numéros affichés sur une figure : au-delà, les numéros se
+# chevauchent et sont illisibles, et chaque numéro est un objet matplotlib
+# (Annotation) de plus à créer et à dessiner
+NOMBRE_MAX_ETIQUETTES = 50
+
+# Mode rapide des fonctions sauvegarder_* : marges fixes (fractions de la
+# figure) au lieu de tight_layout, et résolution réduite
+MARGES_RAPIDES = dict(left=0.08, right=0.98, top=0.94, bottom=0.08)
+DPI_RAPIDE = 100
 
 
 def afficher_instance(points, titre="Instance TSPLIB"):
@@ -16,124 +30,55 @@ def afficher_instance(points, titre="Instance TSPLIB"):
         points: Liste de tuples (id, x, y) représentant les points
         titre: Titre à afficher sur le graphique
     """
-    # Extraction des coordonnées x et y
-    coordonnees_x = []
-    coordonnees_y = []
-    identifiants = []
-    
-    for point in points:
-        identifiants.append(point[0])
-        coordonnees_x.append(point[1])
-        coordonnees_y.append(point[2])
-    
     # Vérification qu'on a des points à afficher
     if len(points) == 0:
         print(f"Attention : aucun point trouvé")
         return
     
-    # Création de la figure
-    plt.figure(figsize=(10, 8))
-    
-    # Affichage des points (plus gros et plus visibles)
-    plt.scatter(coordonnees_x, coordonnees_y, color='blue', s=100, zorder=3, edgecolors='darkblue', linewidths=1)
-    
-    # Affichage des numéros des points (seulement pour les petites instances)
-    if len(points) <= 50:
-        for i in range(len(points)):
-            plt.annotate(
-                str(identifiants[i]),
-                (coordonnees_x[i], coordonnees_y[i]),
-                xytext=(5, 5),
-                textcoords='offset points',
-                fontsize=8,
-                color='black',
-                weight='bold'
-            )
-    
-    # Configuration des axes pour qu'ils soient lisibles
-    plt.xlabel('Coordonnée X', fontsize=12)
-    plt.ylabel('Coordonnée Y', fontsize=12)
-    plt.title(titre, fontsize=14)
-    plt.grid(True, alpha=0.3)
-    
-    # Ajustement automatique des limites pour voir tous les points avec une marge
-    if len(coordonnees_x) > 0:
-        marge_x = (max(coordonnees_x) - min(coordonnees_x)) * 0.1
-        marge_y = (max(coordonnees_y) - min(coordonnees_y)) * 0.1
-        plt.xlim(min(coordonnees_x) - marge_x, max(coordonnees_x) + marge_x)
-        plt.ylim(min(coordonnees_y) - marge_y, max(coordonnees_y) + marge_y)
-    
-    plt.tight_layout()
+    # Création de la figure et dessin de l'instance
+    fig = plt.figure(figsize=(10, 8))
+    _dessiner_instance(fig.add_subplot(), points, titre)
+    fig.tight_layout()
     
     # Affichage du graphique
     plt.show()
 
 
-def sauvegarder_instance(points, chemin_fichier, titre="Instance TSPLIB"):
+def sauvegarder_instance(points, chemin_fichier, titre="Instance TSPLIB", figure=None, rapide=False):
     """
     Sauvegarde l'affichage d'une instance dans un fichier.
     
     Utile pour générer les figures du rapport sans avoir à
     afficher les graphiques à l'écran.
     
+    Une figure existante peut être passée pour être réutilisée d'un appel
+    à l'autre : elle est vidée (figure.clear()) au lieu d'être recréée,
+    ce qui évite de reconstruire une figure et son canevas à chaque image.
+    
+    Le mode rapide est destiné aux images intermédiaires : la figure est
+    dessinée une seule fois (marges fixes, sans tight_layout ni
+    bbox_inches='tight', qui dessinent la figure une fois de plus pour
+    mesurer son contenu) et enregistrée en DPI_RAPIDE points par pouce.
+    Les figures du rapport gardent le mode normal.
+    
     Args:
         points: Liste de tuples (id, x, y) représentant les points
         chemin_fichier: Chemin où sauvegarder l'image
         titre: Titre à afficher sur le graphique
+        figure: Figure matplotlib à réutiliser (None = nouvelle figure)
+        rapide: Si True, marges fixes et résolution réduite (voir ci-dessus)
     """
-    # Extraction des coordonnées x et y
-    coordonnees_x = []
-    coordonnees_y = []
-    identifiants = []
-    
-    for point in points:
-        identifiants.append(point[0])
-        coordonnees_x.append(point[1])
-        coordonnees_y.append(point[2])
-    
-    # Création de la figure
-    plt.figure(figsize=(10, 8))
-    
     # Vérification qu'on a des points à afficher
     if len(points) == 0:
         print(f"Attention : aucun point trouvé pour {chemin_fichier}")
-        plt.close()
         return
     
-    # Affichage des points (plus gros et plus visibles)
-    plt.scatter(coordonnees_x, coordonnees_y, color='blue', s=100, zorder=3, edgecolors='darkblue', linewidths=1)
-    
-    # Affichage des numéros des points (seulement pour les petites instances)
-    if len(points) <= 50:
-        for i in range(len(points)):
-            plt.annotate(
-                str(identifiants[i]),
-                (coordonnees_x[i], coordonnees_y[i]),
-                xytext=(5, 5),
-                textcoords='offset points',
-                fontsize=8,
-                color='black',
-                weight='bold'
-            )
-    
-    # Configuration des axes pour qu'ils soient lisibles
-    plt.xlabel('Coordonnée X', fontsize=12)
-    plt.ylabel('Coordonnée Y', fontsize=12)
-    plt.title(titre, fontsize=14)
-    plt.grid(True, alpha=0.3)
-    
-    # Ajustement automatique des limites pour voir tous les points avec une marge
-    if len(coordonnees_x) > 0:
-        marge_x = (max(coordonnees_x) - min(coordonnees_x)) * 0.1
-        marge_y = (max(coordonnees_y) - min(coordonnees_y)) * 0.1
-        plt.xlim(min(coordonnees_x) - marge_x, max(coordonnees_x) + marge_x)
-        plt.ylim(min(coordonnees_y) - marge_y, max(coordonnees_y) + marge_y)
-    
-    plt.tight_layout()
+    # Création de la figure (ou réutilisation de celle fournie) et dessin
+    fig, ax = _preparer_figure(figure, (10, 8))
+    _dessiner_instance(ax, points, titre)
     
     # Sauvegarde de la figure
-    plt.savefig(chemin_fichier, dpi=150, bbox_inches='tight')
-    plt.close()
+    _enregistrer_figure(fig, figure, chemin_fichier, rapide)
 
 
 def afficher_solution_complete(points, solution, titre="Solution anneau-étoile"):
@@ -151,137 +96,139 @@ def afficher_solution_complete(points, solution, titre="Solution anneau-étoile"
         solution: Dictionnaire de solution créé par construire_solution_initiale
         titre: Titre à afficher sur le graphique
     """
-    # Création d'un dictionnaire pour accéder rapidement aux coordonnées
-    coordonnees_par_id = {}
-    for point in points:
-        coordonnees_par_id[point[0]] = (point[1], point[2])
+    # Création de la figure et dessin de la solution
+    fig = plt.figure(figsize=(12, 10))
+    _dessiner_solution(fig.add_subplot(), points, solution, titre)
+    fig.tight_layout()
     
-    # Séparation des stations et des points non stations
-    stations_set = set(solution['stations'])
-    points_non_stations = []
-    points_stations = []
+    # Affichage du graphique
+    plt.show()
+
+
+def sauvegarder_solution_complete(points, solution, chemin_fichier, titre="Solution anneau-étoile", figure=None,
+                                  rapide=False):
+    """
+    Sauvegarde la visualisation d'une solution complète dans un fichier.
     
-    for point in points:
-        if point[0] in stations_set:
-            points_stations.append(point)
-        else:
-            points_non_stations.append(point)
+    Args:
+        points: Liste de tuples (id, x, y) représentant tous les points
+        solution: Dictionnaire de solution créé par construire_solution_initiale
+        chemin_fichier: Chemin où sauvegarder l'image
+        titre: Titre à afficher sur le graphique
+        figure: Figure matplotlib à réutiliser (None = nouvelle figure)
+        rapide: Si True, marges fixes et résolution réduite (voir sauvegarder_instance)
+    """
+    # Création de la figure (ou réutilisation de celle fournie) et dessin
+    fig, ax = _preparer_figure(figure, (12, 10))
+    _dessiner_solution(ax, points, solution, titre)
     
-    # Création de la figure
-    plt.figure(figsize=(12, 10))
+    # Sauvegarde de la figure
+    _enregistrer_figure(fig, figure, chemin_fichier, rapide)
+
+
+def _dessiner_instance(ax, points, titre):
+    """
+    Dessine le nuage de points d'une instance sur des axes.
     
-    # Affichage des points non stations (en bleu)
-    if points_non_stations:
-        x_non_stations = [p[1] for p in points_non_stations]
-        y_non_stations = [p[2] for p in points_non_stations]
-        plt.scatter(x_non_stations, y_non_stations, color='lightblue', s=30, zorder=2, label='Points non stations')
+    Partagé par afficher_instance (affichage à l'écran) et
+    sauvegarder_instance (fichier image) : les deux produisent
+    exactement le même dessin.
     
-    # Affichage des stations (en rouge, plus gros)
-    if points_stations:
-        x_stations = [p[1] for p in points_stations]
-        y_stations = [p[2] for p in points_stations]
-        plt.scatter(x_stations, y_stations, color='red', s=150, zorder=4, marker='s', label='Stations')
+    Args:
+        ax: Axes matplotlib sur lesquels dessiner
+        points: Liste de tuples (id, x, y) ou objet Points
+        titre: Titre à afficher sur le graphique
+    """
+    # Coordonnées x et y sous forme de tableaux numpy (sans boucle Python)
+    points = _en_tableaux(points)
+    identifiants = points.identifiants
+    coordonnees_x = points.xy[:, 0]
+    coordonnees_y = points.xy[:, 1]
     
-    # Affichage des affectations (lignes grises fines)
-    for id_point, id_station in solution['affectations'].items():
-        if id_point != id_station:  # On n'affiche pas les auto-affectations
-            x_point, y_point = coordonnees_par_id[id_point]
-            x_station, y_station = coordonnees_par_id[id_station]
-            plt.plot([x_point, x_station], [y_point, y_station], 
-                    color='gray', linewidth=0.5, alpha=0.5, zorder=1)
+    # Affichage des points (plus gros et plus visibles)
+    ax.scatter(coordonnees_x, coordonnees_y, color='blue', s=100, zorder=3, edgecolors='darkblue', linewidths=1)
     
-    # Affichage du cycle (lignes noires épaisses)
-    cycle = solution['cycle']
-    if len(cycle) > 1:
-        x_cycle = [coordonnees_par_id[s][0] for s in cycle]
-        y_cycle = [coordonnees_par_id[s][1] for s in cycle]
-        plt.plot(x_cycle, y_cycle, color='black', linewidth=2, zorder=3, label='Cycle')
-    
-    # Affichage des numéros des stations
-    for point in points_stations:
-        plt.annotate(
-            str(point[0]),
-            (point[1], point[2]),
-            xytext=(5, 5),
-            textcoords='offset points',
-            fontsize=10,
-            color='darkred',
-            weight='bold'
-        )
+    # Affichage des numéros des points (seulement pour les petites instances)
+    if len(points) <= NOMBRE_MAX_ETIQUETTES:
+        for i in range(len(points)):
+            ax.annotate(
+                str(identifiants[i]),
+                (coordonnees_x[i], coordonnees_y[i]),
+                xytext=(5, 5),
+                textcoords='offset points',
+                fontsize=8,
+                color='black',
+                weight='bold'
+            )
     
-    # Configuration des axes
-    plt.xlabel('Coordonnée X', fontsize=12)
-    plt.ylabel('Coordonnée Y', fontsize=12)
-    plt.title(f"{titre}\nCoût total: {solution['cout_total']:.2f}", fontsize=14)
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-    plt.tight_layout()
+    # Configuration des axes pour qu'ils soient lisibles
+    ax.set_xlabel('Coordonnée X', fontsize=12)
+    ax.set_ylabel('Coordonnée Y', fontsize=12)
+    ax.set_title(titre, fontsize=14)
+    ax.grid(True, alpha=0.3)
     
-    # Affichage du graphique
-    plt.show()
+    # Ajustement automatique des limites pour voir tous les points avec une marge
+    x_min, y_min = points.xy.min(axis=0)
+    x_max, y_max = points.xy.max(axis=0)
+    marge_x = (x_max - x_min) * 0.1
+    marge_y = (y_max - y_min) * 0.1
+    ax.set_xlim(x_min - marge_x, x_max + marge_x)
+    ax.set_ylim(y_min - marge_y, y_max + marge_y)
 
 
-def sauvegarder_solution_complete(points, solution, chemin_fichier, titre="Solution anneau-étoile"):
+def _dessiner_solution(ax, points, solution, titre):
     """
-    Sauvegarde la visualisation d'une solution complète dans un fichier.
+    Dessine une solution complète (stations, cycle, affectations) sur des axes.
+    
+    Partagé par afficher_solution_complete et sauvegarder_solution_complete.
     
     Args:
-        points: Liste de tuples (id, x, y) représentant tous les points
+        ax: Axes matplotlib sur lesquels dessiner
+        points: Liste de tuples (id, x, y) ou objet Points
         solution: Dictionnaire de solution créé par construire_solution_initiale
-        chemin_fichier: Chemin où sauvegarder l'image
         titre: Titre à afficher sur le graphique
     """
-    # Création d'un dictionnaire pour accéder rapidement aux coordonnées
-    coordonnees_par_id = {}
-    for point in points:
-        coordonnees_par_id[point[0]] = (point[1], point[2])
-    
-    # Séparation des stations et des points non stations
-    stations_set = set(solution['stations'])
-    points_non_stations = []
-    points_stations = []
+    # Coordonnées sous forme de tableau numpy ; indices donne la ligne de
+    # chaque identifiant (construit une seule fois pour l'objet Points)
+    points = _en_tableaux(points)
+    xy = points.xy
+    indices = points.indices
     
-    for point in points:
-        if point[0] in stations_set:
-            points_stations.append(point)
-        else:
-            points_non_stations.append(point)
-    
-    # Création de la figure
-    plt.figure(figsize=(12, 10))
+    # Séparation des stations et des points non stations (masque booléen)
+    est_station = np.isin(points.ids, solution['stations'])
     
     # Affichage des points non stations (en bleu)
-    if points_non_stations:
-        x_non_stations = [p[1] for p in points_non_stations]
-        y_non_stations = [p[2] for p in points_non_stations]
-        plt.scatter(x_non_stations, y_non_stations, color='lightblue', s=30, zorder=2, label='Points non stations')
+    if not est_station.all():
+        ax.scatter(xy[~est_station, 0], xy[~est_station, 1], color='lightblue', s=30, zorder=2, label='Points non stations')
     
     # Affichage des stations (en rouge, plus gros)
-    if points_stations:
-        x_stations = [p[1] for p in points_stations]
-        y_stations = [p[2] for p in points_stations]
-        plt.scatter(x_stations, y_stations, color='red', s=150, zorder=4, marker='s', label='Stations')
+    if est_station.any():
+        ax.scatter(xy[est_station, 0], xy[est_station, 1], color='red', s=150, zorder=4, marker='s', label='Stations')
     
     # Affichage des affectations (lignes grises fines)
-    for id_point, id_station in solution['affectations'].items():
-        if id_point != id_station:  # On n'affiche pas les auto-affectations
-            x_point, y_point = coordonnees_par_id[id_point]
-            x_station, y_station = coordonnees_par_id[id_station]
-            plt.plot([x_point, x_station], [y_point, y_station], 
-                    color='gray', linewidth=0.5, alpha=0.5, zorder=1)
+    # Tous les segments forment une seule LineCollection (un seul objet
+    # matplotlib) au lieu d'une ligne par point
+    segments = _segments_affectations(solution['affectations'], xy, indices)
+    if len(segments) > 0:
+        ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.5,
+                                         alpha=0.5, zorder=1))
     
     # Affichage du cycle (lignes noires épaisses)
     cycle = solution['cycle']
     if len(cycle) > 1:
-        x_cycle = [coordonnees_par_id[s][0] for s in cycle]
-        y_cycle = [coordonnees_par_id[s][1] for s in cycle]
-        plt.plot(x_cycle, y_cycle, color='black', linewidth=2, zorder=3, label='Cycle')
-    
-    # Affichage des numéros des stations
-    for point in points_stations:
-        plt.annotate(
-            str(point[0]),
-            (point[1], point[2]),
+        xy_cycle = xy[[indices[s] for s in cycle]]
+        x_cycle = xy_cycle[:, 0]
+        y_cycle = xy_cycle[:, 1]
+        ax.plot(x_cycle, y_cycle, color='black', linewidth=2, zorder=3, label='Cycle')
+    
+    # Affichage des numéros des stations (seulement s'il y en a peu)
+    lignes_stations = np.flatnonzero(est_station).tolist()
+    if len(lignes_stations) > NOMBRE_MAX_ETIQUETTES:
+        lignes_stations = []
+    for k in lignes_stations:
+        ax.annotate(
+            str(points.identifiants[k]),
+            (xy[k, 0], xy[k, 1]),
             xytext=(5, 5),
             textcoords='offset points',
             fontsize=10,
@@ -290,13 +237,83 @@ def sauvegarder_solution_complete(points, solution, chemin_fichier, titre="Solut
         )
     
     # Configuration des axes
-    plt.xlabel('Coordonnée X', fontsize=12)
-    plt.ylabel('Coordonnée Y', fontsize=12)
-    plt.title(f"{titre}\nCoût total: {solution['cout_total']:.2f}", fontsize=14)
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-    plt.tight_layout()
+    ax.set_xlabel('Coordonnée X', fontsize=12)
+    ax.set_ylabel('Coordonnée Y', fontsize=12)
+    ax.set_title(f"{titre}\nCoût total: {solution['cout_total']:.2f}", fontsize=14)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+
+def _segments_affectations(affectations, xy, indices):
+    """
+    Construit les segments (point, station) des affectations.
     
-    # Sauvegarde de la figure
-    plt.savefig(chemin_fichier, dpi=150, bbox_inches='tight')
-    plt.close()
+    Les auto-affectations (stations) ne sont pas dessinées.
+    
+    Args:
+        affectations: Dictionnaire affectations[id_point] = id_station
+        xy: Tableau (n, 2) des coordonnées des points
+        indices: Dictionnaire id_point -> ligne de xy
+    
+    Returns:
+        Tableau (nombre de segments, 2, 2) des extrémités des segments
+    """
+    lignes_points = []
+    lignes_stations = []
+    for id_point, id_station in affectations.items():
+        if id_point != id_station:
+            lignes_points.append(indices[id_point])
+            lignes_stations.append(indices[id_station])
+    
+    return np.stack([xy[lignes_points], xy[lignes_stations]], axis=1)
+
+
+def _en_tableaux(points):
+    """
+    Renvoie les points sous forme d'objet Points (tableaux numpy).
+    
+    Un objet Points est renvoyé tel quel ; une liste de tuples (id, x, y)
+    est convertie une fois.
+    """
+    if isinstance(points, Points):
+        return points
+    return creer_points([point[0] for point in points],
+                        [(point[1], point[2]) for point in points])
+
+
+def _preparer_figure(figure, taille):
+    """
+    Renvoie une figure vide de la taille demandée et ses axes.
+    
+    Args:
+        figure: Figure à réutiliser, ou None pour en créer une nouvelle
+        taille: Taille (largeur, hauteur) en pouces
+    
+    Returns:
+        Tuple (figure, axes)
+    """
+    if figure is None:
+        figure = plt.figure(figsize=taille)
+    else:
+        figure.clear()
+        figure.set_size_inches(taille)
+    return figure, figure.add_subplot()
+
+
+def _enregistrer_figure(fig, figure, chemin_fichier, rapide=False):
+    """
+    Met en page et enregistre la figure, puis la ferme si elle a été créée
+    pour cet appel.
+    
+    Une figure fournie par l'appelant reste ouverte pour être réutilisée.
+    En mode rapide, les marges sont fixes (MARGES_RAPIDES) et la figure
+    n'est dessinée qu'une fois, au moment de l'enregistrement.
+    """
+    if rapide:
+        fig.subplots_adjust(**MARGES_RAPIDES)
+        fig.savefig(chemin_fichier, dpi=DPI_RAPIDE)
+    else:
+        fig.tight_layout()
+        fig.savefig(chemin_fichier, dpi=150, bbox_inches='tight')
+    if figure is None:
+        plt.close(fig)